@@ -3,15 +3,48 @@ Thesaurus+ Web Interface
 Flask application for the slang-aware thesaurus
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, g
+from flask.json.provider import DefaultJSONProvider
+from flask_caching import Cache
 from database import ThesaurusDB
 import json
 
-app = Flask(__name__)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Serialize jsonify() responses with orjson, keeping Flask's sorted keys"""
 
-# Database connection helper
-def get_db():
-    return ThesaurusDB()
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+app = Flask(__name__)
+if HAS_ORJSON:
+    app.json = OrjsonProvider(app)
+
+# Response cache for the JSON endpoints. The database is read-mostly, so
+# results only change after a rebuild; flush with /api/cache/invalidate.
+# Use RedisCache in production so workers share one cache.
+cache = Cache(app, config={
+    'CACHE_TYPE': 'SimpleCache',
+    'CACHE_DEFAULT_TIMEOUT': 600
+})
+
+@app.before_request
+def attach_db():
+    """Reuse this thread's long-lived database connection for the request"""
+    g.db = ThesaurusDB.get_shared()
 
 @app.route('/')
 def index():
@@ -19,6 +52,7 @@ def index():
     return render_template('index.html')
 
 @app.route('/api/search')
+@cache.cached(timeout=600, query_string=True)
 def api_search():
     """
     API endpoint for word search
@@ -37,143 +71,112 @@ def api_search():
     filter_tags = [t.strip() for t in filter_tags.split(',') if t.strip()]
     min_similarity = float(request.args.get('min_similarity', 0.5))
 
-    with get_db() as db:
-        # Search for word
-        senses = db.search_word(query)
-
-        if not senses:
-            return jsonify({
-                'word': query,
-                'found': False,
-                'message': f"Word '{query}' not found in database"
-            })
-
-        # Build response
-        results = []
-
-        for sense in senses:
-            sense_id = sense['sense_id']
-
-            # Get tags
-            tags = db.get_sense_tags(sense_id)
-            tag_names = [t['tag_name'] for t in tags]
-
-            # Apply tag filter if specified
-            if filter_tags:
-                if not any(tag in tag_names for tag in filter_tags):
-                    continue
-
-            # Get synonyms
-            synonyms = db.get_synonyms(sense_id, min_similarity)
-
-            # Get examples
-            examples = db.get_examples(sense_id)
-
-            # Get related phrases/idioms
-            phrases = db.get_related_phrases(sense_id)
-
-            # Group synonyms by similarity
-            high_sim = [s for s in synonyms if s['similarity_score'] and s['similarity_score'] >= 0.85]
-            med_sim = [s for s in synonyms if s['similarity_score'] and 0.70 <= s['similarity_score'] < 0.85]
-            low_sim = [s for s in synonyms if s['similarity_score'] and s['similarity_score'] < 0.70]
-
-            results.append({
-                'sense_id': sense_id,
-                'word': sense['word'],
-                'pos': sense['pos'],
-                'definition': sense['definition'],
-                'etymology': sense['etymology_text'],
-                'tags': tags,
-                'examples': examples[:3],  # Limit to 3 examples
-                'phrases': phrases[:5],  # Limit to 5 phrases
-                'synonyms': {
-                    'direct': [{'word': s['word'], 'score': s['similarity_score']} for s in high_sim[:15]],
-                    'related': [{'word': s['word'], 'score': s['similarity_score']} for s in med_sim[:10]],
-                    'contextual': [{'word': s['word'], 'score': s['similarity_score']} for s in low_sim[:5]]
-                },
-                'synonym_count': len(synonyms)
-            })
+    db = g.db
+    # Search for word
+    senses = db.search_word(query)
 
+    if not senses:
         return jsonify({
             'word': query,
-            'found': True,
-            'result_count': len(results),
-            'results': results
+            'found': False,
+            'message': f"Word '{query}' not found in database"
+        })
+
+    # Apply tag filter if specified (a sense needs any one of the tags)
+    if filter_tags:
+        matching = db.filter_senses_by_tags([s['sense_id'] for s in senses], filter_tags,
+                                            match_all=False)
+        senses = [s for s in senses if s['sense_id'] in matching]
+
+    # Fetch tags, synonyms, examples and phrases for every sense at once
+    sense_ids = [s['sense_id'] for s in senses]
+    bundle = db.get_senses_bundle(sense_ids, min_similarity)
+
+    # Build response
+    results = []
+
+    for sense in senses:
+        sense_id = sense['sense_id']
+
+        tags = bundle['tags'][sense_id]
+        synonyms = bundle['synonyms'][sense_id]
+        examples = bundle['examples'][sense_id]
+        phrases = bundle['phrases'][sense_id]
+
+        results.append({
+            'sense_id': sense_id,
+            'word': sense['word'],
+            'pos': sense['pos'],
+            'definition': sense['definition'],
+            'etymology': sense['etymology_text'],
+            'tags': tags,
+            'examples': examples[:3],  # Limit to 3 examples
+            'phrases': phrases[:5],  # Limit to 5 phrases
+            'synonyms': {
+                bucket: [{'word': s['word'], 'score': s['similarity_score']} for s in rows]
+                for bucket, rows in synonyms.items()
+            },
+            'synonym_count': bundle['synonym_counts'][sense_id]
         })
 
+    return jsonify({
+        'word': query,
+        'found': True,
+        'result_count': len(results),
+        'results': results
+    })
+
 @app.route('/api/stats')
+@cache.cached(timeout=3600)
 def api_stats():
     """Get database statistics"""
-    with get_db() as db:
-        # Word count
-        cursor = db.execute("SELECT COUNT(*) FROM words")
-        word_count = cursor.fetchone()[0]
-
-        # Sense count
-        cursor = db.execute("SELECT COUNT(*) FROM senses")
-        sense_count = cursor.fetchone()[0]
-
-        # Relationship count
-        cursor = db.execute("SELECT COUNT(*) FROM relationships")
-        relationship_count = cursor.fetchone()[0]
-
-        # Tag count
-        cursor = db.execute("SELECT COUNT(*) FROM tags")
-        tag_count = cursor.fetchone()[0]
-
-        # Example count
-        cursor = db.execute("SELECT COUNT(*) FROM examples")
-        example_count = cursor.fetchone()[0]
-
-        # Top tags
-        cursor = db.execute("""
-            SELECT t.tag_name, t.category, COUNT(st.sense_id) as count
-            FROM tags t
-            JOIN sense_tags st ON t.id = st.tag_id
-            WHERE t.category IN ('register', 'region', 'era')
-            GROUP BY t.id
-            ORDER BY count DESC
-            LIMIT 20
-        """)
-        top_tags = [{'tag': row[0], 'category': row[1], 'count': row[2]} for row in cursor.fetchall()]
+    db = g.db
 
-        return jsonify({
-            'words': word_count,
-            'senses': sense_count,
-            'relationships': relationship_count,
-            'tags': tag_count,
-            'examples': example_count,
-            'top_tags': top_tags
-        })
+    # Table counts (precomputed by the build scripts)
+    stats = db.get_stats()
+
+    # Top tags
+    tag_usage = db.get_tag_usage(['register', 'region', 'era'])
+    top_tags = [{'tag': t['tag_name'], 'category': t['category'], 'count': t['count']}
+                for t in tag_usage if t['count'] > 0][:20]
+
+    return jsonify({
+        'words': stats['words'],
+        'senses': stats['senses'],
+        'relationships': stats['relationships'],
+        'tags': stats['tags'],
+        'examples': stats['examples'],
+        'top_tags': top_tags
+    })
 
 @app.route('/api/tags')
+@cache.cached(timeout=3600)
 def api_tags():
     """Get all available tags for filtering"""
-    with get_db() as db:
-        cursor = db.execute("""
-            SELECT t.tag_name, t.category, COUNT(st.sense_id) as usage_count
-            FROM tags t
-            LEFT JOIN sense_tags st ON t.id = st.tag_id
-            WHERE t.category IN ('register', 'region', 'era', 'offensive')
-            GROUP BY t.id
-            ORDER BY t.category, usage_count DESC
-        """)
-
-        tags_by_category = {}
-        for row in cursor.fetchall():
-            tag_name = row[0]
-            category = row[1] or 'other'
-            count = row[2]
-
-            if category not in tags_by_category:
-                tags_by_category[category] = []
-
-            tags_by_category[category].append({
-                'name': tag_name,
-                'count': count
-            })
-
-        return jsonify(tags_by_category)
+    db = g.db
+
+    tags_by_category = {}
+    for tag in db.get_tag_usage(['register', 'region', 'era', 'offensive']):
+        category = tag['category'] or 'other'
+
+        if category not in tags_by_category:
+            tags_by_category[category] = []
+
+        tags_by_category[category].append({
+            'name': tag['tag_name'],
+            'count': tag['count']
+        })
+
+    return jsonify(tags_by_category)
+
+@app.route('/api/cache/invalidate', methods=['POST'])
+def api_cache_invalidate():
+    """Flush cached API responses (run after rebuilding the database)"""
+    if request.remote_addr not in ('127.0.0.1', '::1'):
+        return jsonify({'error': 'Cache invalidation is only allowed from localhost'}), 403
+
+    cache.clear()
+    return jsonify({'cleared': True})
 
 @app.route('/about')
 def about():
@@ -5,28 +5,17 @@ No confirmation needed - just runs.
 
 from semantic_similarity import SemanticSimilarityEngine
 from database import ThesaurusDB
-import pickle
-from pathlib import Path
 
 def main():
     """Build semantic relationships from cached embeddings"""
 
-    embeddings_file = "embeddings.pkl"
-
-    if not Path(embeddings_file).exists():
-        print(f"ERROR: {embeddings_file} not found!")
-        print("Run: python semantic_similarity.py first")
-        return
-
-    print("Loading cached embeddings...")
-    with open(embeddings_file, 'rb') as f:
-        embeddings = pickle.load(f)
-
-    print(f"Loaded {len(embeddings)} embeddings")
-
     with ThesaurusDB() as db:
         engine = SemanticSimilarityEngine(db)
-        engine.embeddings = embeddings
+
+        if not engine.load_embeddings():
+            print(f"ERROR: {engine.embeddings_file} not found!")
+            print("Run: python semantic_similarity.py first")
+            return
 
         print("\nBuilding semantic similarity relationships...")
         print("Threshold: 0.75")
@@ -37,6 +26,7 @@ def main():
             min_similarity=0.75,
             max_synonyms_per_sense=30
         )
+        db.refresh_stats_cache()
 
     print("\n[OK] Done! Testing...")
 
@@ -4,37 +4,79 @@ Second pass: now that words/senses are in DB, link synonyms together.
 """
 
 import json
+from collections import defaultdict
 from database import ThesaurusDB
 from typing import List, Dict, Tuple, Optional
 from pathlib import Path
 
+# orjson parses Wiktextract lines ~2-3x faster; stdlib json is the fallback
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# Number of buffered relationships written per executemany
+FLUSH_SIZE = 5000
+
+# Number of input lines per transaction
+COMMIT_EVERY = 10000
+
+# Synonym qualifiers that lower the similarity score
+RARE_TAGS = frozenset({'rare', 'archaic', 'obsolete'})
+INFORMAL_TAGS = frozenset({'informal', 'slang'})
+FIGURATIVE_TAGS = frozenset({'figuratively'})
+
+# Secondary indexes dropped during the build and recreated afterwards; the
+# unique relationships index stays, INSERT OR IGNORE depends on it
+DEFERRED_INDEXES = ['idx_rel_src_sim']
+
+
+def may_have_english_synonyms(line: bytes) -> bool:
+    """Cheap byte-level check that a raw JSONL line could yield synonyms"""
+    if b'"synonyms"' not in line:
+        return False
+
+    # Entries without a lang_code are treated as English, so only reject
+    # lines that declare some other language
+    if b'"lang_code"' in line:
+        return b'"lang_code": "en"' in line or b'"lang_code":"en"' in line
+    return True
+
+
 class SynonymBuilder:
     """Build synonym relationships between word senses"""
 
     def __init__(self, db: ThesaurusDB):
         self.db = db
         self.word_sense_cache = {}  # (word, pos) -> [sense_ids]
+        self.word_to_senses = {}  # word -> [sense_ids] across all POS
         self.relationships_created = 0
         self.synonyms_not_found = set()
+        self._pending = []  # (source, target, type, similarity) rows awaiting insert
+        self._seen = set()  # (source, target) pairs already buffered
 
     def load_sense_cache(self):
         """Pre-load all (word, pos) -> sense_ids mappings"""
         print("Loading word/sense cache...")
+        self.word_sense_cache = defaultdict(list)
+
         cursor = self.db.execute("""
             SELECT w.word, s.pos, s.id
             FROM words w
             JOIN senses s ON w.id = s.word_id
         """)
+        cursor.arraysize = 10000
 
-        for row in cursor.fetchall():
-            word = row[0].lower()
-            pos = row[1] or 'unknown'
-            sense_id = row[2]
+        # Stream rows straight into the cache rather than materializing them
+        for word, pos, sense_id in cursor:
+            self.word_sense_cache[(word.lower(), pos or 'unknown')].append(sense_id)
 
-            key = (word, pos)
-            if key not in self.word_sense_cache:
-                self.word_sense_cache[key] = []
-            self.word_sense_cache[key].append(sense_id)
+        # Secondary index for POS-agnostic lookups, grouped by POS in the
+        # same order the (word, pos) keys were first seen
+        self.word_to_senses = {}
+        for (word, pos), sense_ids in self.word_sense_cache.items():
+            self.word_to_senses.setdefault(word, []).extend(sense_ids)
 
         print(f"  Cached {len(self.word_sense_cache)} (word, pos) combinations")
 
@@ -47,11 +89,7 @@ class SynonymBuilder:
             return self.word_sense_cache.get(key, [])
         else:
             # Search all POS for this word
-            results = []
-            for (w, p), sense_ids in self.word_sense_cache.items():
-                if w == word_lower:
-                    results.extend(sense_ids)
-            return results
+            return self.word_to_senses.get(word_lower, [])
 
     def process_entry_synonyms(self, entry: Dict) -> int:
         """Process synonyms for a single Wiktextract entry"""
@@ -69,6 +107,7 @@ class SynonymBuilder:
             return 0
 
         links_created = 0
+        seen = set()  # (source, target) pairs already linked from this entry
 
         # Process each sense
         senses = entry.get('senses', [])
@@ -114,10 +153,16 @@ class SynonymBuilder:
                 # Create relationships to all matching senses
                 # In reality, we should match by definition similarity too
                 # For now, link to all senses with matching POS
+                # Calculate similarity score
+                # Direct Wiktionary synonym = high similarity
+                similarity = self._calculate_similarity(syn_tags)
+
                 for target_sense_id in target_sense_ids[:3]:  # Limit to first 3
-                    # Calculate similarity score
-                    # Direct Wiktionary synonym = high similarity
-                    similarity = self._calculate_similarity(syn_tags)
+                    # Entries often repeat a synonym under several senses
+                    pair = (source_sense_id, target_sense_id)
+                    if pair in seen:
+                        continue
+                    seen.add(pair)
 
                     # Create bidirectional relationship
                     self._create_relationship(source_sense_id, target_sense_id, similarity)
@@ -138,34 +183,37 @@ class SynonymBuilder:
         # Adjust based on tags
         if tags:
             # If it has qualifiers, it might be more contextual
-            if any(t in tags for t in ['rare', 'archaic', 'obsolete']):
+            tag_set = set(tags)
+            if tag_set & RARE_TAGS:
                 score -= 0.15
-            if any(t in tags for t in ['informal', 'slang']):
+            if tag_set & INFORMAL_TAGS:
                 score -= 0.05
-            if any(t in tags for t in ['figuratively']):
+            if tag_set & FIGURATIVE_TAGS:
                 score -= 0.10
 
         return max(0.5, min(1.0, score))
 
     def _create_relationship(self, source_id: int, target_id: int, similarity: float):
-        """Create a synonym relationship"""
+        """Buffer a synonym relationship for the next batched insert"""
         # Avoid self-links
         if source_id == target_id:
             return
 
-        # Check if relationship already exists
-        cursor = self.db.execute("""
-            SELECT id FROM relationships
-            WHERE source_sense_id = ? AND target_sense_id = ?
-            AND relationship_type = 'synonym'
-        """, (source_id, target_id))
+        key = (source_id, target_id)
+        if key in self._seen:
+            return
+        self._seen.add(key)
 
-        if cursor.fetchone():
-            return  # Already exists
+        self._pending.append((source_id, target_id, 'synonym', similarity))
+        if len(self._pending) >= FLUSH_SIZE:
+            self._flush()
 
-        # Create relationship
-        self.db.insert_relationship(source_id, target_id, 'synonym', similarity)
-        self.relationships_created += 1
+    def _flush(self):
+        """Write buffered relationships; existing pairs are skipped by the unique index"""
+        if self._pending:
+            self.relationships_created += self.db.insert_relationships(self._pending)
+        self._pending.clear()
+        self._seen.clear()
 
     def build_from_file(self, filepath: str, max_entries: int = None):
         """Build synonym relationships from Wiktextract file"""
@@ -175,54 +223,78 @@ class SynonymBuilder:
 
         print(f"Building synonym relationships from: {filepath}\n")
 
-        # Load cache
-        self.load_sense_cache()
-
-        entries_processed = 0
-        entries_with_synonyms = 0
+        # Relationship inserts rely on the unique index for deduplication
+        self.db.ensure_indexes()
 
-        print("\nProcessing synonyms...")
+        # Bulk-load settings: skip fsyncs and per-row maintenance of indexes
+        # that are cheaper to rebuild once at the end
+        self.db.execute("PRAGMA synchronous=OFF")
+        for index_name in DEFERRED_INDEXES:
+            self.db.execute(f"DROP INDEX IF EXISTS {index_name}")
 
-        with open(filepath, 'r', encoding='utf-8') as f:
-            for line in f:
-                if max_entries and entries_processed >= max_entries:
-                    break
+        # Restore indexes and settings even if the load fails part way, so
+        # an interrupted build never leaves the deferred indexes dropped
+        try:
+            # Load cache
+            self.load_sense_cache()
 
-                try:
-                    entry = json.loads(line)
+            entries_processed = 0
+            entries_with_synonyms = 0
+            lines_skipped = 0
 
-                    # Only process if entry has synonyms
-                    has_synonyms = False
-                    for sense in entry.get('senses', []):
-                        if sense.get('synonyms'):
-                            has_synonyms = True
-                            break
+            print("\nProcessing synonyms...")
 
-                    if has_synonyms:
-                        links = self.process_entry_synonyms(entry)
-                        if links > 0:
-                            entries_with_synonyms += 1
+            with open(filepath, 'rb') as f:
+                for line in f:
+                    if max_entries and entries_processed >= max_entries:
+                        break
 
-                    # Commit in batches
-                    if entries_processed % 100 == 0:
+                    if entries_processed and entries_processed % COMMIT_EVERY == 0:
                         self.db.commit()
 
-                    if entries_processed % 1000 == 0 and entries_processed > 0:
+                    if entries_processed and entries_processed % 1000 == 0:
                         print(f"  Processed {entries_processed:,} entries, "
                               f"created {self.relationships_created:,} links")
 
-                except Exception as e:
-                    print(f"Error processing entry: {e}")
-
-                entries_processed += 1
-
-        # Final commit
-        self.db.commit()
+                    # Most lines are non-English or have no synonyms; skip them
+                    # without paying for a JSON decode
+                    if not may_have_english_synonyms(line):
+                        lines_skipped += 1
+                        entries_processed += 1
+                        continue
+
+                    try:
+                        entry = json_loads(line)
+
+                        # Only process if entry has synonyms
+                        has_synonyms = False
+                        for sense in entry.get('senses', []):
+                            if sense.get('synonyms'):
+                                has_synonyms = True
+                                break
+
+                        if has_synonyms:
+                            links = self.process_entry_synonyms(entry)
+                            if links > 0:
+                                entries_with_synonyms += 1
+
+                    except Exception as e:
+                        print(f"Error processing entry: {e}")
+
+                    entries_processed += 1
+        finally:
+            # Write remaining relationships, then restore indexes and settings
+            self._flush()
+            self.db.commit()
+            self.db.ensure_indexes()
+            self.db.execute("ANALYZE")
+            self.db.execute("PRAGMA synchronous=NORMAL")
 
         print(f"\n{'='*70}")
         print(" SYNONYM BUILDING COMPLETE")
         print(f"{'='*70}")
         print(f"Entries processed: {entries_processed:,}")
+        print(f"Skipped before parsing: {lines_skipped:,}")
         print(f"Entries with synonyms: {entries_with_synonyms:,}")
         print(f"Relationships created: {self.relationships_created:,}")
         print(f"Synonyms not found in DB: {len(self.synonyms_not_found)}")
@@ -253,6 +325,7 @@ def main():
     with ThesaurusDB() as db:
         builder = SynonymBuilder(db)
         builder.build_from_file(filename, max_entries)
+        db.refresh_stats_cache()
 
     print("\n[OK] Synonym relationships built successfully")
     print("\nTest with:")
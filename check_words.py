@@ -3,10 +3,15 @@ from database import ThesaurusDB
 words = ['cool', 'lit', 'fire', 'cap', 'dope', 'sick', 'hot']
 
 with ThesaurusDB() as db:
+    placeholders = ','.join('?' * len(words))
+    cursor = db.execute(
+        f"SELECT word, id FROM words WHERE language_code = 'en' AND word IN ({placeholders})",
+        words
+    )
+    found = {row[0]: row[1] for row in cursor.fetchall()}
+
     for word in words:
-        cursor = db.execute("SELECT id FROM words WHERE word = ? AND language_code = 'en'", (word,))
-        result = cursor.fetchone()
-        if result:
-            print(f"{word}: EXISTS (id={result[0]})")
+        if word in found:
+            print(f"{word}: EXISTS (id={found[word]})")
         else:
             print(f"{word}: MISSING")
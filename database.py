@@ -4,12 +4,61 @@ Handles initialization, queries, and data access
 """
 
 import sqlite3
+import threading
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Set, Tuple
 from datetime import datetime
 
 DB_FILE = "thesaurus.db"
 
+# Similarity score bands used to group synonyms for display
+DIRECT_SIMILARITY = 0.85
+RELATED_SIMILARITY = 0.70
+SYNONYM_BUCKETS = ('direct', 'related', 'contextual')
+
+# Applied to every connection after opening. NORMAL sync is safe under WAL
+# and drops the fsync per commit; mmap and a 128 MB page cache keep reads
+# off the syscall path.
+CONNECTION_PRAGMAS = """
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=1073741824;
+    PRAGMA cache_size=-131072;
+    PRAGMA busy_timeout=5000;
+"""
+
+# Indexes the query and bulk-insert paths rely on. Created with IF NOT EXISTS
+# so they can also be applied to databases built before they were added.
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_words_word_lang ON words(word, language_code)",
+    # Expression index backing the case-insensitive lookup in search_word
+    "CREATE INDEX IF NOT EXISTS idx_words_lower ON words(LOWER(word), language_code)",
+    "CREATE INDEX IF NOT EXISTS idx_senses_word ON senses(word_id)",
+    # Lets builders use INSERT OR IGNORE instead of SELECT-then-INSERT
+    """CREATE UNIQUE INDEX IF NOT EXISTS idx_rel_src_tgt_type
+       ON relationships(source_sense_id, target_sense_id, relationship_type)""",
+    # Covers get_synonyms: seek by source, already ordered by score
+    """CREATE INDEX IF NOT EXISTS idx_rel_src_sim
+       ON relationships(source_sense_id, relationship_type, similarity_score DESC)""",
+    "CREATE INDEX IF NOT EXISTS idx_sense_tags_sense ON sense_tags(sense_id, tag_id)",
+    # Tag usage counts: find tags by category, then their senses
+    "CREATE INDEX IF NOT EXISTS idx_tags_category ON tags(category)",
+    "CREATE INDEX IF NOT EXISTS idx_sense_tags_tag ON sense_tags(tag_id, sense_id)",
+    "CREATE INDEX IF NOT EXISTS idx_examples_sense ON examples(sense_id)",
+    "CREATE INDEX IF NOT EXISTS idx_phrase_senses_sense ON phrase_senses(sense_id)",
+    # Lets the phrase importer use INSERT OR IGNORE for links
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_phrase_senses_unique ON phrase_senses(phrase_id, sense_id)",
+]
+
+# Tables counted for the stats endpoints
+STATS_TABLES = ('words', 'senses', 'relationships', 'tags', 'examples')
+
+# Per-connection prepared statement cache size. The IN (...) lookups produce
+# a distinct SQL string per batch size, which overflows sqlite3's default 128.
+CACHED_STATEMENTS = 512
+
+_shared = threading.local()
+
 class ThesaurusDB:
     """Main database interface"""
 
@@ -24,12 +73,52 @@ class ThesaurusDB:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
-    def connect(self):
+    def connect(self, read_only: bool = False):
         """Open database connection"""
-        self.conn = sqlite3.connect(self.db_path)
+        self.conn = sqlite3.connect(self.db_path, cached_statements=CACHED_STATEMENTS)
         self.conn.row_factory = sqlite3.Row  # Access columns by name
+        self._configure(self.conn, read_only)
         return self.conn
 
+    @staticmethod
+    def _configure(conn: sqlite3.Connection, read_only: bool = False):
+        """Apply performance pragmas to a freshly opened connection"""
+        # journal_mode is stored in the database file, so only switch it once.
+        # The switch is a write; on a read-only file or mount keep the
+        # existing mode so searches still work.
+        if conn.execute("PRAGMA journal_mode").fetchone()[0] != 'wal':
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.OperationalError:
+                pass
+        conn.executescript(CONNECTION_PRAGMAS)
+
+        if read_only:
+            conn.execute("PRAGMA query_only=ON")
+
+    @classmethod
+    def get_shared(cls, db_path: str = DB_FILE) -> 'ThesaurusDB':
+        """
+        Get a read-only connection kept open for the lifetime of the current thread.
+
+        Used by long-running processes (the web app) to avoid reconnecting
+        and re-applying pragmas on every request. Runs in autocommit mode;
+        callers must not close it.
+        """
+        connections = getattr(_shared, 'connections', None)
+        if connections is None:
+            connections = _shared.connections = {}
+
+        db = connections.get(db_path)
+        if db is None:
+            db = cls(db_path)
+            db.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None,
+                                      cached_statements=CACHED_STATEMENTS)
+            db.conn.row_factory = sqlite3.Row
+            cls._configure(db.conn, read_only=True)
+            connections[db_path] = db
+        return db
+
     def close(self):
         """Close database connection"""
         if self.conn:
@@ -41,6 +130,24 @@ class ThesaurusDB:
         cursor.execute(query, params)
         return cursor
 
+    def _plain_cursor(self) -> sqlite3.Cursor:
+        """Cursor returning plain tuples, for queries that only index rows by position"""
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        return cursor
+
+    def fetch_dicts(self, query: str, params: tuple = ()) -> List[Dict]:
+        """
+        Execute a query and return rows as dicts.
+
+        Fetches plain tuples and zips them with the column names once,
+        which is cheaper than converting sqlite3.Row objects per column.
+        """
+        cursor = self._plain_cursor()
+        cursor.execute(query, params)
+        columns = [d[0] for d in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
     def executemany(self, query: str, params_list: List[tuple]):
         """Execute many queries"""
         cursor = self.conn.cursor()
@@ -65,11 +172,19 @@ class ThesaurusDB:
 
         # Execute schema
         self.conn.executescript(schema)
+        self.ensure_indexes()
+        self.execute("ANALYZE")
         self.commit()
 
         print("[OK] Database initialized successfully")
         self._print_stats()
 
+    def ensure_indexes(self):
+        """Create any missing indexes from INDEXES"""
+        for statement in INDEXES:
+            self.execute(statement)
+        self.commit()
+
     def _print_stats(self):
         """Print database statistics"""
         cursor = self.execute("SELECT COUNT(*) FROM words")
@@ -135,6 +250,13 @@ class ThesaurusDB:
             (sense_id, tag_id)
         )
 
+    def link_sense_tags(self, rows: List[tuple]):
+        """Link many (sense_id, tag_id) pairs in one executemany"""
+        self.executemany(
+            "INSERT OR IGNORE INTO sense_tags (sense_id, tag_id) VALUES (?, ?)",
+            rows
+        )
+
     def insert_relationship(self, source_sense_id: int, target_sense_id: int,
                            rel_type: str, similarity: float = None):
         """Create a relationship between two senses"""
@@ -145,6 +267,21 @@ class ThesaurusDB:
             (source_sense_id, target_sense_id, rel_type, similarity)
         )
 
+    def insert_relationships(self, rows: List[tuple]) -> int:
+        """
+        Insert many (source_sense_id, target_sense_id, rel_type, similarity) rows.
+
+        Rows that already exist are skipped via the unique index on
+        relationships. Returns the number of rows actually inserted.
+        """
+        cursor = self.executemany(
+            """INSERT OR IGNORE INTO relationships
+               (source_sense_id, target_sense_id, relationship_type, similarity_score)
+               VALUES (?, ?, ?, ?)""",
+            rows
+        )
+        return cursor.rowcount
+
     def insert_example(self, sense_id: int, example_text: str, source: str = None):
         """Add usage example to a sense"""
         self.execute(
@@ -152,78 +289,326 @@ class ThesaurusDB:
             (sense_id, example_text, source)
         )
 
+    def insert_examples(self, rows: List[tuple]):
+        """Add many (sense_id, example_text, source) usage examples"""
+        self.executemany(
+            "INSERT INTO examples (sense_id, example_text, source) VALUES (?, ?, ?)",
+            rows
+        )
+
     # ==================== QUERY OPERATIONS ====================
 
-    def search_word(self, word: str) -> List[Dict]:
-        """Find all senses of a word"""
-        cursor = self.execute(
-            """SELECT w.id as word_id, w.word, s.id as sense_id, s.pos, s.definition, s.etymology_text
-               FROM words w
-               JOIN senses s ON w.id = s.word_id
-               WHERE w.word = ?
-               ORDER BY s.sense_index""",
+    def search_word(self, word: str, group_by_pos: bool = False) -> List[Dict]:
+        """
+        Find all senses of an English word, ignoring case.
+
+        Senses come in sense_index order. With group_by_pos, senses sharing a
+        POS are made adjacent, with groups in order of their first sense, so
+        callers can itertools.groupby them.
+        """
+        order = "s.sense_index"
+        if group_by_pos:
+            order = ("MIN(s.sense_index) OVER (PARTITION BY COALESCE(s.pos, 'unknown')), "
+                     "COALESCE(s.pos, 'unknown'), s.sense_index")
+
+        return self.fetch_dicts(
+            f"""SELECT w.id as word_id, w.word, s.id as sense_id, s.pos, s.definition, s.etymology_text
+                FROM words w
+                JOIN senses s ON w.id = s.word_id
+                WHERE LOWER(w.word) = LOWER(?) AND w.language_code = 'en'
+                ORDER BY {order}""",
             (word,)
         )
-        return [dict(row) for row in cursor.fetchall()]
 
-    def get_sense_tags(self, sense_id: int) -> List[str]:
-        """Get all tags for a sense"""
-        cursor = self.execute(
-            """SELECT t.tag_name, t.category
+    def _fetch_grouped(self, query: str, sense_ids: List[int], params: tuple = ()) -> Dict[int, List[Dict]]:
+        """Run a `sense_id IN (...)` query and group rows by its first (sense_id) column"""
+        grouped = {sense_id: [] for sense_id in sense_ids}
+        if not sense_ids:
+            return grouped
+
+        placeholders = ','.join('?' * len(sense_ids))
+        cursor = self._plain_cursor()
+        cursor.execute(query.format(placeholders), (*sense_ids, *params))
+
+        columns = [d[0] for d in cursor.description[1:]]
+        for row in cursor.fetchall():
+            grouped[row[0]].append(dict(zip(columns, row[1:])))
+        return grouped
+
+    def get_sense_tags_bulk(self, sense_ids: List[int]) -> Dict[int, List[Dict]]:
+        """Get tags for many senses in one query"""
+        return self._fetch_grouped(
+            """SELECT st.sense_id, t.tag_name, t.category
                FROM tags t
                JOIN sense_tags st ON t.id = st.tag_id
-               WHERE st.sense_id = ?""",
-            (sense_id,)
+               WHERE st.sense_id IN ({})""",
+            sense_ids
         )
-        return [dict(row) for row in cursor.fetchall()]
 
-    def get_synonyms(self, sense_id: int, min_similarity: float = 0.0) -> List[Dict]:
-        """Get synonyms for a sense"""
-        cursor = self.execute(
-            """SELECT w.word, s.definition, r.similarity_score, s.pos
+    def get_synonyms_bulk(self, sense_ids: List[int], min_similarity: float = 0.0) -> Dict[int, List[Dict]]:
+        """Get synonyms for many senses in one query"""
+        return self._fetch_grouped(
+            """SELECT r.source_sense_id as sense_id, w.word, s.definition, r.similarity_score, s.pos
                FROM relationships r
                JOIN senses s ON r.target_sense_id = s.id
                JOIN words w ON s.word_id = w.id
-               WHERE r.source_sense_id = ?
+               WHERE r.source_sense_id IN ({})
                AND r.relationship_type = 'synonym'
                AND (r.similarity_score >= ? OR r.similarity_score IS NULL)
                ORDER BY r.similarity_score DESC""",
-            (sense_id, min_similarity)
+            sense_ids, (min_similarity,)
         )
-        return [dict(row) for row in cursor.fetchall()]
 
-    def get_examples(self, sense_id: int) -> List[str]:
-        """Get usage examples for a sense"""
+    def get_synonyms_with_tag_bulk(self, sense_ids: List[int], tag_name: str,
+                                   min_similarity: float = 0.0) -> Dict[int, List[Dict]]:
+        """Get the distinct synonym words whose target sense carries a tag, for many senses in one query"""
+        return self._fetch_grouped(
+            """SELECT r.source_sense_id as sense_id, w.word
+               FROM relationships r
+               JOIN senses s ON r.target_sense_id = s.id
+               JOIN words w ON s.word_id = w.id
+               WHERE r.source_sense_id IN ({})
+               AND r.relationship_type = 'synonym'
+               AND (r.similarity_score >= ? OR r.similarity_score IS NULL)
+               AND EXISTS (
+                   SELECT 1 FROM sense_tags st
+                   JOIN tags t ON st.tag_id = t.id
+                   WHERE st.sense_id = s.id AND t.tag_name = ?
+               )
+               GROUP BY r.source_sense_id, w.word
+               ORDER BY MAX(r.similarity_score) DESC""",
+            sense_ids, (min_similarity, tag_name)
+        )
+
+    def get_synonyms_bucketed_bulk(self, sense_ids: List[int], min_similarity: float = 0.0,
+                                   high: int = 15, med: int = 10, low: int = 5) -> Dict[int, Dict[str, List[Dict]]]:
+        """
+        Get the top synonyms per similarity band for many senses in one query.
+
+        Bands are direct (>= 0.85), related (0.70-0.85) and contextual (< 0.70),
+        each capped at high/med/low rows. The cap is applied inside SQLite so
+        synonyms that would be discarded never reach Python.
+        """
+        grouped = {sense_id: {bucket: [] for bucket in SYNONYM_BUCKETS} for sense_id in sense_ids}
+        if not sense_ids:
+            return grouped
+
+        placeholders = ','.join('?' * len(sense_ids))
         cursor = self.execute(
-            "SELECT example_text FROM examples WHERE sense_id = ?",
-            (sense_id,)
+            f"""SELECT sense_id, bucket, word, similarity_score
+                FROM (
+                    SELECT sense_id, bucket, word, similarity_score,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY sense_id, bucket
+                               ORDER BY similarity_score DESC
+                           ) as bucket_rank
+                    FROM (
+                        SELECT r.source_sense_id as sense_id, w.word, r.similarity_score,
+                               CASE WHEN r.similarity_score >= ? THEN 0
+                                    WHEN r.similarity_score >= ? THEN 1
+                                    ELSE 2 END as bucket
+                        FROM relationships r
+                        JOIN senses s ON r.target_sense_id = s.id
+                        JOIN words w ON s.word_id = w.id
+                        WHERE r.source_sense_id IN ({placeholders})
+                        AND r.relationship_type = 'synonym'
+                        AND r.similarity_score >= ?
+                    )
+                )
+                WHERE bucket_rank <= CASE bucket WHEN 0 THEN ? WHEN 1 THEN ? ELSE ? END
+                ORDER BY sense_id, bucket, bucket_rank""",
+            (DIRECT_SIMILARITY, RELATED_SIMILARITY, *sense_ids, min_similarity, high, med, low)
         )
-        return [row[0] for row in cursor.fetchall()]
 
-    def get_related_phrases(self, sense_id: int) -> List[Dict]:
-        """Get phrases/idioms related to this sense"""
+        for sense_id, bucket, word, score in cursor.fetchall():
+            grouped[sense_id][SYNONYM_BUCKETS[bucket]].append({'word': word, 'similarity_score': score})
+        return grouped
+
+    def get_synonym_counts_bulk(self, sense_ids: List[int], min_similarity: float = 0.0) -> Dict[int, int]:
+        """Count synonyms (including unscored ones) for many senses in one query"""
+        counts = {sense_id: 0 for sense_id in sense_ids}
+        if not sense_ids:
+            return counts
+
+        placeholders = ','.join('?' * len(sense_ids))
         cursor = self.execute(
-            """SELECT p.phrase_text, p.definition, p.phrase_type
+            f"""SELECT source_sense_id, COUNT(*)
+                FROM relationships
+                WHERE source_sense_id IN ({placeholders})
+                AND relationship_type = 'synonym'
+                AND (similarity_score >= ? OR similarity_score IS NULL)
+                GROUP BY source_sense_id""",
+            (*sense_ids, min_similarity)
+        )
+        counts.update(cursor.fetchall())
+        return counts
+
+    def get_examples_bulk(self, sense_ids: List[int]) -> Dict[int, List[str]]:
+        """Get usage examples for many senses in one query"""
+        grouped = self._fetch_grouped(
+            "SELECT sense_id, example_text FROM examples WHERE sense_id IN ({})",
+            sense_ids
+        )
+        return {sense_id: [row['example_text'] for row in rows] for sense_id, rows in grouped.items()}
+
+    def get_related_phrases_bulk(self, sense_ids: List[int]) -> Dict[int, List[Dict]]:
+        """Get phrases/idioms for many senses in one query"""
+        return self._fetch_grouped(
+            """SELECT ps.sense_id, p.phrase_text, p.definition, p.phrase_type
                FROM phrases p
                JOIN phrase_senses ps ON p.id = ps.phrase_id
-               WHERE ps.sense_id = ?
+               WHERE ps.sense_id IN ({})
                ORDER BY p.phrase_type, p.phrase_text""",
-            (sense_id,)
+            sense_ids
         )
-        return [dict(row) for row in cursor.fetchall()]
+
+    def get_senses_bundle(self, sense_ids: List[int], min_similarity: float = 0.0) -> Dict[str, Dict[int, List]]:
+        """
+        Get tags, synonyms, examples and phrases for a batch of senses.
+
+        Issues one query per dataset regardless of how many senses are passed,
+        instead of four queries per sense. Each dataset maps sense_id -> rows;
+        synonyms come pre-grouped by similarity band (see
+        get_synonyms_bucketed_bulk) with totals in synonym_counts.
+        """
+        return {
+            'tags': self.get_sense_tags_bulk(sense_ids),
+            'synonyms': self.get_synonyms_bucketed_bulk(sense_ids, min_similarity),
+            'synonym_counts': self.get_synonym_counts_bulk(sense_ids, min_similarity),
+            'examples': self.get_examples_bulk(sense_ids),
+            'phrases': self.get_related_phrases_bulk(sense_ids),
+        }
+
+    def get_sense_tags(self, sense_id: int) -> List[Dict]:
+        """Get all tags for a sense"""
+        return self.get_sense_tags_bulk([sense_id])[sense_id]
+
+    def get_synonyms(self, sense_id: int, min_similarity: float = 0.0) -> List[Dict]:
+        """Get synonyms for a sense"""
+        return self.get_synonyms_bulk([sense_id], min_similarity)[sense_id]
+
+    def get_examples(self, sense_id: int) -> List[str]:
+        """Get usage examples for a sense"""
+        return self.get_examples_bulk([sense_id])[sense_id]
+
+    def get_synonyms_bucketed(self, sense_id: int, min_similarity: float = 0.0,
+                              high: int = 15, med: int = 10, low: int = 5) -> Dict[str, List[Dict]]:
+        """Get the top synonyms per similarity band for a sense"""
+        return self.get_synonyms_bucketed_bulk([sense_id], min_similarity, high, med, low)[sense_id]
+
+    def get_related_phrases(self, sense_id: int) -> List[Dict]:
+        """Get phrases/idioms related to this sense"""
+        return self.get_related_phrases_bulk([sense_id])[sense_id]
+
+    def filter_senses_by_tags(self, sense_ids: List[int], required_tags: List[str],
+                              match_all: bool = True) -> Set[int]:
+        """
+        Get the subset of sense_ids tagged with the given tags, in one query.
+
+        With match_all a sense needs every tag; otherwise any one is enough.
+        """
+        if not required_tags:
+            return set(sense_ids)
+        if not sense_ids:
+            return set()
+
+        required_tags = set(required_tags)
+        min_matches = len(required_tags) if match_all else 1
+
+        sense_placeholders = ','.join('?' * len(sense_ids))
+        tag_placeholders = ','.join('?' * len(required_tags))
+        cursor = self.execute(
+            f"""SELECT st.sense_id
+                FROM sense_tags st
+                JOIN tags t ON t.id = st.tag_id
+                WHERE t.tag_name IN ({tag_placeholders})
+                AND st.sense_id IN ({sense_placeholders})
+                GROUP BY st.sense_id
+                HAVING COUNT(DISTINCT t.tag_name) >= ?""",
+            (*required_tags, *sense_ids, min_matches)
+        )
+        return {row[0] for row in cursor.fetchall()}
 
     def filter_by_tags(self, sense_id: int, required_tags: List[str]) -> bool:
         """Check if a sense has all required tags"""
-        cursor = self.execute(
-            """SELECT COUNT(DISTINCT t.tag_name)
-               FROM tags t
-               JOIN sense_tags st ON t.id = st.tag_id
-               WHERE st.sense_id = ?
-               AND t.tag_name IN ({})""".format(','.join('?' * len(required_tags))),
-            (sense_id, *required_tags)
+        return sense_id in self.filter_senses_by_tags([sense_id], required_tags)
+
+    # ==================== AGGREGATE CACHE ====================
+
+    def refresh_stats_cache(self):
+        """
+        Recompute table counts and tag usage into stats_cache/tag_usage_cache.
+
+        Called by the build scripts after they change the data, so the web
+        endpoints can read a handful of rows instead of scanning every table.
+        """
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS stats_cache (
+                key TEXT PRIMARY KEY,
+                value INTEGER,
+                updated_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS tag_usage_cache (
+                tag_id INTEGER PRIMARY KEY,
+                category TEXT,
+                tag_name TEXT,
+                count INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_tag_usage_category
+                ON tag_usage_cache(category, count DESC, tag_id, tag_name);
+        """)
+
+        now = datetime.now().isoformat()
+        counts = [(table, self.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0], now)
+                  for table in STATS_TABLES]
+        self.executemany(
+            "INSERT OR REPLACE INTO stats_cache (key, value, updated_at) VALUES (?, ?, ?)",
+            counts
         )
-        count = cursor.fetchone()[0]
-        return count == len(required_tags)
+
+        self.execute("DELETE FROM tag_usage_cache")
+        self.execute("""
+            INSERT INTO tag_usage_cache (tag_id, category, tag_name, count)
+            SELECT t.id, t.category, t.tag_name, COUNT(st.sense_id)
+            FROM tags t
+            LEFT JOIN sense_tags st ON t.id = st.tag_id
+            GROUP BY t.id
+        """)
+        self.commit()
+
+    def _has_stats_cache(self) -> bool:
+        """Check whether refresh_stats_cache has been run on this database"""
+        try:
+            return self.execute("SELECT 1 FROM stats_cache LIMIT 1").fetchone() is not None
+        except sqlite3.OperationalError:  # Table not created yet
+            return False
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get row counts for STATS_TABLES, from the cache when available"""
+        if self._has_stats_cache():
+            cursor = self.execute("SELECT key, value FROM stats_cache")
+            return {row[0]: row[1] for row in cursor.fetchall()}
+
+        return {table: self.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in STATS_TABLES}
+
+    def get_tag_usage(self, categories: List[str]) -> List[Dict]:
+        """Get usage counts for tags in the given categories, most used first"""
+        placeholders = ','.join('?' * len(categories))
+        if self._has_stats_cache():
+            query = f"""SELECT tag_name, category, count
+                        FROM tag_usage_cache
+                        WHERE category IN ({placeholders})
+                        ORDER BY count DESC, tag_id"""
+        else:
+            query = f"""SELECT t.tag_name, t.category, COUNT(st.sense_id) as count
+                        FROM tags t
+                        LEFT JOIN sense_tags st ON t.id = st.tag_id
+                        WHERE t.category IN ({placeholders})
+                        GROUP BY t.id
+                        ORDER BY count DESC, t.id"""
+
+        return self.fetch_dicts(query, tuple(categories))
 
 
 def init_database():
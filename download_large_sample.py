@@ -2,13 +2,152 @@
 Download a larger sample from Wiktextract for scaling up the database.
 """
 
+import io
+import os
 import requests
-import gzip
 import json
+import time
+import urllib3
+from collections import Counter
+from multiprocessing import Pool
 from pathlib import Path
+from import_wiktextract import iter_lines, mark_english_only
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# python-isal's igzip is a drop-in gzip with SIMD inflate; stdlib is the fallback
+try:
+    from isal import igzip as gzip
+except ImportError:
+    import gzip
+
+# orjson parses Wiktextract lines ~2-3x faster; stdlib json is the fallback
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# pysimdjson parses lazily: filters read fields straight off the parsed
+# document and only the entries that pass get converted to dicts
+try:
+    import simdjson
+    HAS_SIMDJSON = True
+except ImportError:
+    HAS_SIMDJSON = False
+
+# ijson's C backend streams parse events, so analyze_sample can count fields
+# without building dicts; only used when pysimdjson is missing
+try:
+    import ijson.backends.yajl2_c as ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+# pyarrow turns analyze_sample into a columnar scan with vectorized counts
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.json as pa_json
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
 
 DATA_URL = "https://kaikki.org/dictionary/raw-wiktextract-data.jsonl.gz"
 
+# Buffer for reads from the compressed HTTP stream (stdlib default is 8 KB)
+READ_BUFFER_SIZE = 1 << 20
+
+# Samples at least this large are analyzed with one process per CPU
+PARALLEL_MIN_BYTES = 32 << 20
+
+# Minimum seconds between progress lines in long-running loops
+PROGRESS_INTERVAL = 1.0
+
+# Reconnect attempts after the stream drops mid-download
+STREAM_RETRIES = 3
+
+# Shared keep-alive session; failed connects and 5xx responses are retried
+# with backoff before a download gives up
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=1, status_forcelist=(500, 502, 503, 504))
+))
+
+
+class ResumableStream(io.RawIOBase):
+    """Raw HTTP body that resumes with a Range request if the connection drops"""
+
+    def __init__(self, url: str, timeout: int = 60, retries: int = STREAM_RETRIES):
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.offset = 0  # Bytes delivered so far
+        self._response = self._open()
+
+    def _open(self):
+        headers = {'Range': f'bytes={self.offset}-'} if self.offset else {}
+        response = SESSION.get(self.url, stream=True, timeout=self.timeout, headers=headers)
+        response.raise_for_status()
+
+        if self.offset and response.status_code != 206:
+            response.close()
+            raise IOError(f"Server ignored Range request at byte {self.offset:,}")
+        return response
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        for attempt in range(self.retries + 1):
+            try:
+                n = self._response.raw.readinto(buffer)
+                self.offset += n
+                return n
+            except (OSError, urllib3.exceptions.HTTPError) as e:
+                if attempt == self.retries:
+                    raise
+                print(f"  Connection lost at byte {self.offset:,} ({e}), resuming...")
+                self._response.close()
+                self._response = self._open()
+
+    def close(self):
+        if not self.closed:
+            self._response.close()
+        super().close()
+
+
+def open_data_stream(url: str = DATA_URL, timeout: int = 60):
+    """Open the compressed Wiktextract dump as a buffered, resumable byte stream"""
+    return io.BufferedReader(ResumableStream(url, timeout), READ_BUFFER_SIZE)
+
+
+def has_english_marker(line: bytes) -> bool:
+    """Cheap byte-level check for an English lang_code, spaced or compact"""
+    return b'"lang_code": "en"' in line or b'"lang_code":"en"' in line
+
+
+def is_english_entry(line: bytes) -> bool:
+    """
+    Decide whether a raw JSONL line is an English entry.
+
+    A line whose only lang_code key is English is accepted without parsing.
+    Lines that also carry nested lang_codes (translations, descendants) are
+    parsed to check the entry's own.
+    """
+    if not has_english_marker(line):
+        return False
+    if line.count(b'"lang_code"') == 1:
+        return True
+
+    try:
+        return json_loads(line).get('lang_code', '') == 'en'
+    except json.JSONDecodeError:
+        return False
+
+
 def download_large_sample(sample_size=50000, output_file="wiktionary_large.jsonl"):
     """
     Download a larger sample of Wiktextract data.
@@ -21,35 +160,27 @@ def download_large_sample(sample_size=50000, output_file="wiktionary_large.jsonl
     print(f"This will take several minutes...\n")
 
     try:
-        # Stream the compressed file
-        response = requests.get(DATA_URL, stream=True, timeout=60)
-        response.raise_for_status()
-
         lines_written = 0
         english_entries = 0
+        last_report = time.monotonic()
 
-        with open(output_file, 'w', encoding='utf-8') as outfile:
-            # Decompress on the fly
-            with gzip.open(response.raw, 'rt', encoding='utf-8') as gz_file:
+        # Stream the compressed file
+        with open(output_file, 'wb') as outfile, open_data_stream() as raw:
+            # Decompress on the fly; raw bytes go straight to the parser
+            with gzip.open(raw, 'rb') as gz_file:
                 for line in gz_file:
-                    # Parse to check if it's English
-                    try:
-                        entry = json.loads(line)
-                        lang_code = entry.get('lang_code', '')
-
-                        # Only save English entries
-                        if lang_code == 'en':
-                            outfile.write(line)
-                            english_entries += 1
+                    # Only save English entries; raw bytes are copied through
+                    if is_english_entry(line):
+                        outfile.write(line)
+                        english_entries += 1
 
-                            if english_entries % 1000 == 0:
-                                print(f"  Downloaded {english_entries:,} English entries...")
+                        now = time.monotonic()
+                        if now - last_report >= PROGRESS_INTERVAL:
+                            print(f"  Downloaded {english_entries:,} English entries...")
+                            last_report = now
 
-                            if english_entries >= sample_size:
-                                break
-
-                    except json.JSONDecodeError:
-                        continue
+                        if english_entries >= sample_size:
+                            break
 
                     lines_written += 1
 
@@ -58,6 +189,9 @@ def download_large_sample(sample_size=50000, output_file="wiktionary_large.jsonl
                         print(f"\nReached scan limit ({lines_written:,} total entries scanned)")
                         break
 
+        # Lets the importer skip its own language check on this file
+        mark_english_only(output_file)
+
         print(f"\n[OK] Downloaded {english_entries:,} English entries")
         print(f"Saved to: {output_file}")
         print(f"File size: {Path(output_file).stat().st_size / 1024 / 1024:.1f} MB")
@@ -69,43 +203,184 @@ def download_large_sample(sample_size=50000, output_file="wiktionary_large.jsonl
         return 0
 
 
-def analyze_sample(filename="wiktionary_large.jsonl"):
-    """Quick analysis of downloaded data"""
-    print(f"\n{'='*70}")
-    print(" ANALYZING SAMPLE")
-    print(f"{'='*70}\n")
+# Sense tags counted as slang by analyze_sample
+SLANG_TAGS = frozenset({'slang', 'informal'})
+
+
+def _summarize_entry(entry) -> tuple:
+    """Pull (word, pos, has_slang_tag, has_synonyms) out of a parsed entry"""
+    has_slang = False
+    for sense in entry.get('senses', []):
+        if not SLANG_TAGS.isdisjoint(sense.get('tags', ())):
+            has_slang = True
+            break
+
+    return (entry.get('word', ''), entry.get('pos', 'unknown'),
+            has_slang, bool(entry.get('synonyms')))
+
+
+def _scan_range(task: tuple) -> tuple:
+    """
+    Line-at-a-time pass over the lines starting in [start, end) of a file.
+
+    Returns (total, words, pos_counts, slang, synonyms) with the raw word set
+    so results from several ranges can be merged.
+    """
+    filename, start, end = task
+    word_list = []
+    pos_list = []
+    has_slang_tag = 0
+    has_synonyms = 0
+    total = 0
+
+    parser = simdjson.Parser() if HAS_SIMDJSON else None
+
+    for line in iter_lines(filename, start, end):
+        # Only a handful of fields are read, so the lazy document is
+        # never converted; it is summarized inside the helper and dropped
+        # before the parser is reused
+        entry = parser.parse(line) if parser else json_loads(line)
+        word, pos_name, is_slang, has_syns = _summarize_entry(entry)
+        del entry
+        total += 1
+
+        word_list.append(word)
+        pos_list.append(pos_name)
+
+        # Check for slang
+        if is_slang:
+            has_slang_tag += 1
+
+        # Check for synonyms
+        if has_syns:
+            has_synonyms += 1
+
+    # Lowercasing, deduplication and counting all run in C over the lists
+    words = set(map(str.lower, word_list))
+    return total, words, Counter(pos_list), has_slang_tag, has_synonyms
+
+
+def _scan_sample(filename: str, workers: int = 1) -> tuple:
+    """Line-at-a-time pass returning (total, unique_words, pos_counts, slang, synonyms)"""
+    size = os.path.getsize(filename)
+    if workers <= 1:
+        total, words, pos_counts, has_slang_tag, has_synonyms = _scan_range((filename, 0, size))
+        return total, len(words), pos_counts, has_slang_tag, has_synonyms
+
+    # Split into byte ranges; each worker snaps its range to line boundaries
+    step = -(-size // workers)
+    tasks = [(filename, offset, min(offset + step, size)) for offset in range(0, size, step)]
+    with Pool(workers) as pool:
+        results = pool.map(_scan_range, tasks)
 
     words = set()
-    pos_counts = {}
+    pos_counts = Counter()
+    total = has_slang_tag = has_synonyms = 0
+    for part_total, part_words, part_pos, part_slang, part_syns in results:
+        total += part_total
+        words |= part_words
+        pos_counts.update(part_pos)
+        has_slang_tag += part_slang
+        has_synonyms += part_syns
+
+    return total, len(words), pos_counts, has_slang_tag, has_synonyms
+
+
+def _scan_sample_events(filename: str) -> tuple:
+    """Event-stream version of _scan_sample using ijson"""
+    words = set()
+    pos_counts = Counter()
     has_slang_tag = 0
     has_synonyms = 0
     total = 0
 
-    with open(filename, 'r', encoding='utf-8') as f:
-        for line in f:
-            entry = json.loads(line)
-            total += 1
+    with open(filename, 'rb') as f:
+        for prefix, event, value in ijson.parse(f, multiple_values=True):
+            if prefix == '':
+                if event == 'start_map':
+                    word, pos, is_slang, has_syns = '', 'unknown', False, False
+                elif event == 'end_map':
+                    total += 1
+                    words.add(word.lower())
+                    pos_counts[pos] += 1
+                    if is_slang:
+                        has_slang_tag += 1
+                    if has_syns:
+                        has_synonyms += 1
+            elif prefix == 'word' and event == 'string':
+                word = value
+            elif prefix == 'pos' and event == 'string':
+                pos = value
+            elif prefix == 'senses.item.tags.item':
+                if value in SLANG_TAGS:
+                    is_slang = True
+            elif prefix == 'synonyms.item':
+                has_syns = True
+
+    return total, len(words), pos_counts, has_slang_tag, has_synonyms
+
+
+def _scan_sample_arrow(filename: str) -> tuple:
+    """Columnar version of _scan_sample using pyarrow's JSON reader"""
+    table = pa_json.read_json(filename, read_options=pa_json.ReadOptions(block_size=8 << 20))
+    columns = table.column_names
+
+    word_col = table['word'].fill_null('') if 'word' in columns else pa.array([''] * table.num_rows)
+    unique_words = pc.count_distinct(pc.utf8_lower(word_col)).as_py()
+
+    pos_col = table['pos'].fill_null('unknown') if 'pos' in columns else pa.array(['unknown'] * table.num_rows)
+    pos_counts = {item['values']: item['counts'] for item in pc.value_counts(pos_col).to_pylist()}
+
+    # Count entries with any sense tagged slang/informal: flatten senses and
+    # their tags, then map matching tags back to the row they came from
+    has_slang_tag = 0
+    if 'senses' in columns and 'tags' in [f.name for f in table.schema.field('senses').type.value_type]:
+        flagged = pa.array(sorted(SLANG_TAGS))
+        for batch in table.select(['senses']).to_batches():
+            senses = batch.column(0)
+            sense_rows = pc.list_parent_indices(senses)
+            tags = pc.struct_field(pc.list_flatten(senses), 'tags')
+            tag_rows = sense_rows.take(pc.list_parent_indices(tags))
+            matches = pc.is_in(pc.list_flatten(tags), value_set=flagged)
+            has_slang_tag += pc.count_distinct(pc.filter(tag_rows, matches)).as_py()
+
+    has_synonyms = 0
+    if 'synonyms' in columns:
+        lengths = pc.list_value_length(table['synonyms'])
+        has_synonyms = pc.sum(pc.greater(lengths, 0)).as_py() or 0
+
+    return table.num_rows, unique_words, pos_counts, has_slang_tag, has_synonyms
+
+
+def analyze_sample(filename="wiktionary_large.jsonl"):
+    """Quick analysis of downloaded data"""
+    print(f"\n{'='*70}")
+    print(" ANALYZING SAMPLE")
+    print(f"{'='*70}\n")
+
+    stats = None
+    if HAS_PYARROW:
+        try:
+            stats = _scan_sample_arrow(filename)
+        except (pa.ArrowException, KeyError, TypeError) as e:
+            # Schema inference fails on mixed-type fields; use the line loop
+            print(f"  (columnar scan unavailable: {e})")
 
-            word = entry.get('word', '')
-            words.add(word.lower())
+    # Large samples are split across processes; JSON parsing holds the GIL
+    workers = os.cpu_count() or 1
+    if stats is None and workers > 1 and os.path.getsize(filename) >= PARALLEL_MIN_BYTES:
+        stats = _scan_sample(filename, workers)
 
-            pos = entry.get('pos', 'unknown')
-            pos_counts[pos] = pos_counts.get(pos, 0) + 1
+    if stats is None and HAS_IJSON and not HAS_SIMDJSON:
+        stats = _scan_sample_events(filename)
 
-            # Check for slang
-            senses = entry.get('senses', [])
-            for sense in senses:
-                tags = sense.get('tags', [])
-                if 'slang' in tags or 'informal' in tags:
-                    has_slang_tag += 1
-                    break
+    if stats is None:
+        stats = _scan_sample(filename)
 
-            # Check for synonyms
-            if entry.get('synonyms'):
-                has_synonyms += 1
+    total, unique_words, pos_counts, has_slang_tag, has_synonyms = stats
 
     print(f"Total entries: {total:,}")
-    print(f"Unique words: {len(words):,}")
+    print(f"Unique words: {unique_words:,}")
     print(f"Entries with slang/informal tags: {has_slang_tag:,} ({has_slang_tag/total*100:.1f}%)")
     print(f"Entries with synonyms: {has_synonyms:,} ({has_synonyms/total*100:.1f}%)")
 
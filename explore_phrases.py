@@ -1,17 +1,27 @@
 """Explore phrase and idiom data in Wiktextract"""
 import json
 
+# orjson parses Wiktextract lines ~2-3x faster; stdlib json is the fallback
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# Tags that mark an idiom sense
+IDIOM_TAGS = frozenset({'idiomatic', 'idiom'})
+
 print("Exploring phrases and idioms in Wiktextract data...")
 print("="*70)
 
 # Load sample entries
 entries = []
-with open('wiktionary_large.jsonl', 'r', encoding='utf-8') as f:
+with open('wiktionary_large.jsonl', 'rb') as f:
     for i, line in enumerate(f):
         if i >= 5000:  # Check first 5000 entries
             break
         try:
-            entries.append(json.loads(line))
+            entries.append(json_loads(line))
         except:
             continue
 
@@ -22,7 +32,7 @@ idiom_entries = []
 for entry in entries:
     for sense in entry.get('senses', []):
         tags = sense.get('tags', [])
-        if 'idiomatic' in tags or 'idiom' in tags:
+        if not IDIOM_TAGS.isdisjoint(tags):
             idiom_entries.append({
                 'word': entry.get('word'),
                 'pos': entry.get('pos'),
@@ -3,14 +3,17 @@ Fetch a small sample from Wiktextract data to explore structure.
 Downloads just the first 1000 lines instead of the full 2.3GB file.
 """
 
-import requests
-import gzip
 import json
 from pathlib import Path
+from download_large_sample import DATA_URL, open_data_stream
+from fetch_specific_words import make_line_matcher
+
+# python-isal's igzip is a drop-in gzip with SIMD inflate; stdlib is the fallback
+try:
+    from isal import igzip as gzip
+except ImportError:
+    import gzip
 
-# Wiktextract data URL (compressed)
-# Try different possible URLs
-DATA_URL = "https://kaikki.org/dictionary/raw-wiktextract-data.jsonl.gz"
 SAMPLE_SIZE = 1000  # Number of lines to download
 OUTPUT_FILE = "wiktionary_sample.jsonl"
 
@@ -21,15 +24,12 @@ def download_sample():
     print("This may take a minute...\n")
 
     try:
-        # Stream the compressed file
-        response = requests.get(DATA_URL, stream=True)
-        response.raise_for_status()
-
         lines_written = 0
 
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as outfile:
-            # Decompress on the fly
-            with gzip.open(response.raw, 'rt', encoding='utf-8') as gz_file:
+        # Stream the compressed file
+        with open(OUTPUT_FILE, 'wb') as outfile, open_data_stream() as raw:
+            # Decompress on the fly; lines are copied through as raw bytes
+            with gzip.open(raw, 'rb') as gz_file:
                 for line in gz_file:
                     outfile.write(line)
                     lines_written += 1
@@ -97,8 +97,14 @@ def find_word(word_to_find):
     """Search sample for a specific word"""
     print(f"\nSearching for '{word_to_find}'...\n")
 
-    with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
+    may_match = make_line_matcher([word_to_find])
+
+    with open(OUTPUT_FILE, 'rb') as f:
         for line in f:
+            # Only parse lines that mention the word under a "word" key
+            if not may_match(line):
+                continue
+
             entry = json.loads(line)
             if entry.get('word', '').lower() == word_to_find.lower():
                 print(json.dumps(entry, indent=2))
@@ -3,12 +3,37 @@ Stream through the full Wiktextract data to find specific words.
 Doesn't download everything - just searches for what you need.
 """
 
-import requests
-import gzip
 import json
-
-# Wiktextract data URL
-DATA_URL = "https://kaikki.org/dictionary/raw-wiktextract-data.jsonl.gz"
+import time
+from download_large_sample import PROGRESS_INTERVAL, open_data_stream
+
+# python-isal's igzip is a drop-in gzip with SIMD inflate; stdlib is the fallback
+try:
+    from isal import igzip as gzip
+except ImportError:
+    import gzip
+
+# orjson parses Wiktextract lines ~2-3x faster; stdlib json is the fallback
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# pysimdjson, when installed, reads the headword off a lazy document and
+# only converts matching entries
+try:
+    import simdjson
+    HAS_SIMDJSON = True
+except ImportError:
+    HAS_SIMDJSON = False
+
+# pyahocorasick matches every target pattern in a single pass over a line
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
 
 # Words to search for
 TARGET_WORDS = [
@@ -24,6 +49,57 @@ TARGET_WORDS = [
     "lit"
 ]
 
+def word_patterns(target_words) -> list:
+    """
+    Byte patterns for a "word" key holding any target word, spaced and compact.
+
+    Returns None when a target is non-ASCII: lines are lowercased as bytes,
+    which only folds ASCII, so the pre-filter could miss a match.
+    """
+    if not all(word.isascii() for word in target_words):
+        return None
+
+    patterns = []
+    for word in target_words:
+        quoted = json.dumps(word.lower()).encode()
+        patterns.append(b'"word": ' + quoted)
+        patterns.append(b'"word":' + quoted)
+    return patterns
+
+
+def make_line_matcher(target_words):
+    """
+    Return a predicate telling whether a raw JSONL line may hold a target word.
+
+    Matching is case-insensitive. With pyahocorasick all patterns are found
+    in one automaton pass; otherwise each pattern is a bytes substring test.
+    """
+    patterns = word_patterns(target_words)
+    if patterns is None:
+        return lambda line: True
+
+    if HAS_AHOCORASICK:
+        # Patterns are ASCII, so latin-1 maps bytes to chars one-to-one and
+        # offsets in the decoded line line up with the raw bytes
+        automaton = ahocorasick.Automaton()
+        for pattern in patterns:
+            automaton.add_word(pattern.decode('latin-1'), None)
+        automaton.make_automaton()
+
+        def matches(line: bytes) -> bool:
+            for _ in automaton.iter(line.lower().decode('latin-1')):
+                return True
+            return False
+
+        return matches
+
+    def matches(line: bytes) -> bool:
+        lowered = line.lower()
+        return any(p in lowered for p in patterns)
+
+    return matches
+
+
 def stream_search_words(target_words, max_entries=50000):
     """
     Stream through compressed data looking for specific words.
@@ -36,29 +112,46 @@ def stream_search_words(target_words, max_entries=50000):
     # Track what we've found
     found_words = {word.lower(): [] for word in target_words}
     entries_scanned = 0
+    may_match = make_line_matcher(target_words)
+    parser = simdjson.Parser() if HAS_SIMDJSON else None
+    last_report = time.monotonic()
 
     try:
         # Stream the compressed file
-        response = requests.get(DATA_URL, stream=True, timeout=30)
-        response.raise_for_status()
-
-        with gzip.open(response.raw, 'rt', encoding='utf-8') as gz_file:
+        with open_data_stream(timeout=30) as raw, gzip.open(raw, 'rb') as gz_file:
             for line in gz_file:
                 entries_scanned += 1
 
-                if entries_scanned % 5000 == 0:
+                now = time.monotonic()
+                if now - last_report >= PROGRESS_INTERVAL:
                     found_count = sum(1 for v in found_words.values() if v)
                     print(f"  Scanned {entries_scanned} entries... Found {found_count}/{len(target_words)} words")
-
-                entry = json.loads(line)
-                word = entry.get('word', '').lower()
-
-                # Check if this is one of our target words
-                if word in found_words:
-                    found_words[word].append(entry)
-
-                # Stop if we found everything or hit max
-                if all(found_words.values()) or entries_scanned >= max_entries:
+                    last_report = now
+
+                # Only parse lines that mention a target word somewhere;
+                # the parse confirms it is the entry's own headword
+                if may_match(line):
+                    if parser:
+                        # The lazy document is only valid until the next
+                        # parse, so convert matches and drop it right away
+                        doc = parser.parse(line)
+                        word = doc.get('word', '').lower()
+                        entry = doc.as_dict() if word in found_words else None
+                        del doc
+                    else:
+                        entry = json_loads(line)
+                        word = entry.get('word', '').lower()
+
+                    # Check if this is one of our target words
+                    if word in found_words:
+                        found_words[word].append(entry)
+
+                        # Stop if we found everything
+                        if all(found_words.values()):
+                            break
+
+                # Stop if we hit max
+                if entries_scanned >= max_entries:
                     break
 
         # Report results
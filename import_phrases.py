@@ -3,8 +3,40 @@ Import phrases and idioms from Wiktextract into the database
 Links phrases to related word senses for discovery
 """
 import json
+import re
+import time
 from database import ThesaurusDB
 from datetime import datetime
+from import_wiktextract import iter_lines
+
+# orjson parses Wiktextract lines ~2-3x faster; stdlib json is the fallback
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# pysimdjson parses lazily: filters read fields straight off the parsed
+# document and only the entries that pass get converted to dicts
+try:
+    import simdjson
+    HAS_SIMDJSON = True
+except ImportError:
+    HAS_SIMDJSON = False
+
+# Tokenizer and stop words for linking phrases to their component words
+WORD_RE = re.compile(r'\b\w+\b')
+STOP_WORDS = frozenset({'a', 'an', 'the', 'and', 'or', 'but', 'of', 'to', 'in',
+                        'on', 'at', 'by', 'for', 'with', 'from', 'as', 'is', 'was'})
+
+# Sense tags that decide the phrase type, checked sense by sense
+PHRASE_TYPE_TAGS = frozenset({'idiomatic', 'proverb'})
+
+# Minimum seconds between progress lines
+PROGRESS_INTERVAL = 1.0
+
+# Senses linked per component word
+LINKED_SENSES = 2
 
 class PhraseImporter:
     """Import and link phrases/idioms to word senses"""
@@ -13,6 +45,7 @@ class PhraseImporter:
         self.db = db
         self.imported_count = 0
         self.linked_count = 0
+        self._pending_tokens = []  # (phrase_id, component word) rows awaiting linking
 
     def is_phrase(self, entry: dict) -> bool:
         """Check if entry is a multi-word phrase/idiom"""
@@ -22,25 +55,37 @@ class PhraseImporter:
         if ' ' in word:
             return True
 
-        # Tagged as idiomatic
-        for sense in entry.get('senses', []):
-            if 'idiomatic' in sense.get('tags', []):
-                return True
+        # Tagged as idiomatic on any sense
+        all_tags = set().union(*(sense.get('tags', ()) for sense in entry.get('senses', ())))
+        return 'idiomatic' in all_tags
+
+    def _load_phrase(self, parser, line: bytes):
+        """Parse a JSONL line, returning the entry only if it is a phrase"""
+        if parser is None:
+            entry = json_loads(line)
+            return entry if self.is_phrase(entry) else None
 
-        return False
+        # The lazy document must not outlive this call; the parser reuses
+        # its buffer for the next line
+        doc = parser.parse(line)
+        return doc.as_dict() if self.is_phrase(doc) else None
 
     def get_phrase_type(self, entry: dict) -> str:
         """Determine phrase type: idiom, proverb, collocation, slang phrase"""
         word = entry.get('word', '')
 
-        # Check tags
-        for sense in entry.get('senses', []):
-            tags = sense.get('tags', [])
+        # Check tags; most entries carry neither, so test the union first
+        # and only walk the senses to find which one comes first
+        senses = entry.get('senses', [])
+        all_tags = set().union(*(sense.get('tags', ()) for sense in senses))
+        if not PHRASE_TYPE_TAGS.isdisjoint(all_tags):
+            for sense in senses:
+                tags = sense.get('tags', [])
 
-            if 'idiomatic' in tags:
-                return 'idiom'
-            elif 'proverb' in tags:
-                return 'proverb'
+                if 'idiomatic' in tags:
+                    return 'idiom'
+                elif 'proverb' in tags:
+                    return 'proverb'
 
         # Check POS for collocations
         pos = entry.get('pos', '')
@@ -51,16 +96,9 @@ class PhraseImporter:
 
     def extract_component_words(self, phrase: str) -> list:
         """Extract meaningful words from phrase for linking"""
-        # Remove punctuation and split
-        import re
-        words = re.findall(r'\b\w+\b', phrase.lower())
-
-        # Filter out common stop words
-        stop_words = {'a', 'an', 'the', 'and', 'or', 'but', 'of', 'to', 'in',
-                     'on', 'at', 'by', 'for', 'with', 'from', 'as', 'is', 'was'}
-
-        meaningful_words = [w for w in words if w not in stop_words and len(w) > 2]
-        return meaningful_words
+        # Remove punctuation and split, then filter out common stop words
+        return [w for w in WORD_RE.findall(phrase.lower())
+                if len(w) > 2 and w not in STOP_WORDS]
 
     def import_phrase(self, entry: dict) -> int:
         """Import a phrase and link it to related word senses"""
@@ -100,48 +138,49 @@ class PhraseImporter:
             phrase_id = cursor.lastrowid
             self.imported_count += 1
 
-        # Link to component word senses
-        component_words = self.extract_component_words(phrase_text)
-
-        for word in component_words:
-            # Find word in database
-            cursor = self.db.execute("""
-                SELECT id FROM words WHERE word = ? AND language_code = 'en'
-            """, (word,))
-
-            word_row = cursor.fetchone()
-            if not word_row:
-                continue
-
-            word_id = word_row[0]
-
-            # Get senses for this word
-            cursor = self.db.execute("""
-                SELECT id FROM senses WHERE word_id = ? LIMIT 5
-            """, (word_id,))
-
-            sense_rows = cursor.fetchall()
-
-            # Link phrase to first few senses of each component word
-            for sense_row in sense_rows[:2]:  # Link to top 2 senses
-                sense_id = sense_row[0]
-
-                # Check if link already exists
-                cursor = self.db.execute("""
-                    SELECT 1 FROM phrase_senses
-                    WHERE phrase_id = ? AND sense_id = ?
-                """, (phrase_id, sense_id))
-
-                if not cursor.fetchone():
-                    # Create link
-                    self.db.execute("""
-                        INSERT INTO phrase_senses (phrase_id, sense_id, relationship_type)
-                        VALUES (?, ?, 'contains')
-                    """, (phrase_id, sense_id))
-                    self.linked_count += 1
+        # Queue component words; _flush_links resolves them to senses
+        for word in self.extract_component_words(phrase_text):
+            self._pending_tokens.append((phrase_id, word))
 
         return phrase_id
 
+    def _flush_links(self):
+        """
+        Link queued component words to their senses in one join.
+
+        Tokens go into a temp table and a single INSERT ... SELECT links each
+        phrase to the first LINKED_SENSES senses of every component word that
+        exists in the database. Existing links are skipped by the unique index.
+        """
+        if not self._pending_tokens:
+            return
+
+        self.db.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS phrase_tokens (
+                seq INTEGER PRIMARY KEY,
+                phrase_id INTEGER,
+                token TEXT
+            )
+        """)
+        self.db.executemany(
+            "INSERT INTO phrase_tokens (phrase_id, token) VALUES (?, ?)",
+            self._pending_tokens
+        )
+        cursor = self.db.execute("""
+            INSERT OR IGNORE INTO phrase_senses (phrase_id, sense_id, relationship_type)
+            SELECT pt.phrase_id, s.id, 'contains'
+            FROM phrase_tokens pt
+            JOIN words w ON w.word = pt.token AND w.language_code = 'en'
+            JOIN senses s ON s.id IN (
+                SELECT id FROM senses WHERE word_id = w.id ORDER BY id LIMIT ?
+            )
+            ORDER BY pt.seq, s.id
+        """, (LINKED_SENSES,))
+        self.linked_count += cursor.rowcount
+
+        self.db.execute("DELETE FROM phrase_tokens")
+        self._pending_tokens.clear()
+
     def import_from_wiktextract(self, filename: str = 'wiktionary_large.jsonl', limit: int = 1000):
         """Import phrases from Wiktextract JSONL file"""
         print("\n" + "="*70)
@@ -153,31 +192,41 @@ class PhraseImporter:
 
         processed = 0
         phrase_count = 0
+        parser = simdjson.Parser() if HAS_SIMDJSON else None
+        last_report = time.monotonic()
+
+        # Link inserts rely on the unique index for deduplication and on the
+        # word/sense indexes for the token join
+        self.db.ensure_indexes()
 
-        with open(filename, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
+        for line in iter_lines(filename):
+            try:
+                # Check if this is a phrase/idiom
+                entry = self._load_phrase(parser, line)
+                if entry is not None:
+                    phrase_count += 1
 
-                    # Check if this is a phrase/idiom
-                    if self.is_phrase(entry):
-                        phrase_count += 1
+                    if phrase_count <= limit:
+                        phrase_id = self.import_phrase(entry)
 
-                        if phrase_count <= limit:
-                            phrase_id = self.import_phrase(entry)
+                        if phrase_id and phrase_count % 50 == 0:
+                            self._flush_links()
+                            self.db.commit()
 
-                            if phrase_id and phrase_count % 50 == 0:
+                            now = time.monotonic()
+                            if now - last_report >= PROGRESS_INTERVAL:
                                 print(f"  Imported {self.imported_count} phrases, created {self.linked_count} links...")
-                                self.db.commit()
+                                last_report = now
 
-                        if phrase_count >= limit:
-                            break
+                    if phrase_count >= limit:
+                        break
 
-                    processed += 1
+                processed += 1
 
-                except Exception as e:
-                    continue
+            except Exception as e:
+                continue
 
+        self._flush_links()
         self.db.commit()
 
         print("\n" + "="*70)
@@ -4,18 +4,113 @@ Converts JSON entries into normalized database structure
 """
 
 import json
+import mmap
+import os
+import re
+from functools import partial
 from database import ThesaurusDB
 from typing import Dict, List
 from pathlib import Path
 
+# orjson parses Wiktextract lines ~2-3x faster; stdlib json is the fallback
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# pysimdjson, when installed, parses with one reusable parser per file
+try:
+    import simdjson
+    HAS_SIMDJSON = True
+except ImportError:
+    HAS_SIMDJSON = False
+
+# Exact tag -> category matches for _categorize_tag
+TAG_CATEGORIES = {
+    **dict.fromkeys(['slang', 'informal', 'formal', 'colloquial', 'vulgar', 'poetic'], 'register'),
+    **dict.fromkeys(['archaic', 'obsolete', 'dated', 'historical'], 'era'),
+    **dict.fromkeys(['transitive', 'intransitive', 'countable', 'uncountable', 'plural', 'singular'], 'grammar'),
+    **dict.fromkeys(['offensive', 'derogatory', 'pejorative', 'slur'], 'offensive'),
+}
+
+# Substrings that mark a regional tag (none of the exact tags above contain one)
+REGION_RE = re.compile(r'british|us|american|australian|canadian|aave')
+
+# Number of buffered tag links/examples written per executemany
+FLUSH_SIZE = 1000
+
+# Number of imported entries per transaction
+COMMIT_EVERY = 10000
+
+
+def iter_lines(filepath: str, start: int = 0, end: int = None):
+    """
+    Yield the raw lines (without newlines) that start in [start, end) of a file.
+
+    Lines are sliced straight out of a read-only mmap instead of going
+    through a buffered reader.
+    """
+    with open(filepath, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+
+            if end is None or end > size:
+                end = size
+
+            # Snap to the first line that starts at or after `start`
+            if start > 0 and mm[start - 1] != ord('\n'):
+                newline = mm.find(b'\n', start)
+                start = size if newline == -1 else newline + 1
+
+            find = mm.find
+            while start < end:
+                newline = find(b'\n', start)
+                if newline == -1:
+                    newline = size
+                yield mm[start:newline]
+                start = newline + 1
+
+
+# Empty marker written next to a downloaded sample whose lines were all
+# filtered to English entries at download time
+ENGLISH_ONLY_SUFFIX = '.en-only'
+
+
+def mark_english_only(filepath: str) -> None:
+    """Record that every line of a JSONL file is an English entry"""
+    Path(filepath + ENGLISH_ONLY_SUFFIX).touch()
+
+
+def is_english_only(filepath: str) -> bool:
+    """True if a file has a marker that is not older than the file itself"""
+    marker = Path(filepath + ENGLISH_ONLY_SUFFIX)
+    return marker.exists() and marker.stat().st_mtime >= Path(filepath).stat().st_mtime
+
+
+def may_be_english(line: bytes) -> bool:
+    """Cheap byte-level check that a raw JSONL line could be an English entry"""
+    # Entries without a lang_code are imported as English, so only reject
+    # lines that declare some other language
+    if b'"lang_code"' in line:
+        return b'"lang_code": "en"' in line or b'"lang_code":"en"' in line
+    return True
+
+
 class WiktextractImporter:
     """Import Wiktextract JSON into database"""
 
     def __init__(self, db: ThesaurusDB):
         self.db = db
         self.tag_cache = {}  # Cache tag IDs for performance
-        self.word_cache = {}  # Cache word IDs
-        self.sense_cache = {}  # Map (word, pos, def) -> sense_id for synonym linking
+        self.word_cache = {}  # English word -> word_id
+        self._tag_links = []  # (sense_id, tag_id) rows awaiting insert
+        self._examples = []  # (sense_id, text, source) rows awaiting insert
 
     def load_tag_cache(self):
         """Pre-load all tag IDs"""
@@ -45,13 +140,11 @@ class WiktextractImporter:
         if lang_code != 'en':
             return
 
-        # Insert word
-        word_key = (word_text, lang_code)
-        if word_key in self.word_cache:
-            word_id = self.word_cache[word_key]
-        else:
+        # Insert word; only English gets here, so the word alone is the key
+        word_id = self.word_cache.get(word_text)
+        if word_id is None:
             word_id = self.db.insert_word(word_text, language, lang_code)
-            self.word_cache[word_key] = word_id
+            self.word_cache[word_text] = word_id
 
         # Get POS and etymology
         pos = entry.get('pos', None)
@@ -63,9 +156,9 @@ class WiktextractImporter:
             return
 
         for sense_index, sense_data in enumerate(senses, 1):
-            self._import_sense(word_id, word_text, pos, sense_data, sense_index, etymology)
+            self._import_sense(word_id, pos, sense_data, sense_index, etymology)
 
-    def _import_sense(self, word_id: int, word_text: str, pos: str,
+    def _import_sense(self, word_id: int, pos: str,
                       sense_data: Dict, sense_index: int, etymology: str) -> None:
         """Import a single word sense"""
         # Get definition
@@ -84,17 +177,14 @@ class WiktextractImporter:
             etymology=etymology
         )
 
-        # Cache this sense for synonym linking
-        sense_key = (word_text.lower(), pos, definition[:100])
-        self.sense_cache[sense_key] = sense_id
-
         # Process tags
         tags = sense_data.get('tags', [])
         for tag_name in tags:
-            # Categorize tag
-            category = self._categorize_tag(tag_name)
-            tag_id = self.get_or_create_tag(tag_name, category)
-            self.db.link_sense_tag(sense_id, tag_id)
+            # Categorize only tags that still need to be created
+            tag_id = self.tag_cache.get(tag_name)
+            if tag_id is None:
+                tag_id = self.get_or_create_tag(tag_name, self._categorize_tag(tag_name))
+            self._tag_links.append((sense_id, tag_id))
 
         # Process examples
         examples = sense_data.get('examples', [])
@@ -106,37 +196,38 @@ class WiktextractImporter:
                 example_text = example
 
             if example_text:
-                self.db.insert_example(sense_id, example_text, 'Wiktionary')
+                self._examples.append((sense_id, example_text, 'Wiktionary'))
+
+        if len(self._tag_links) >= FLUSH_SIZE or len(self._examples) >= FLUSH_SIZE:
+            self._flush()
 
         # Process synonyms (create relationships)
         synonyms = sense_data.get('synonyms', [])
         if synonyms:
             self._process_synonyms(sense_id, synonyms)
 
+    def _flush(self):
+        """Write buffered tag links and examples"""
+        if self._tag_links:
+            self.db.link_sense_tags(self._tag_links)
+            self._tag_links.clear()
+        if self._examples:
+            self.db.insert_examples(self._examples)
+            self._examples.clear()
+
     def _categorize_tag(self, tag_name: str) -> str:
         """Determine category for a tag"""
         tag_lower = tag_name.lower()
 
-        # Register/tone
-        if tag_lower in ['slang', 'informal', 'formal', 'colloquial', 'vulgar', 'poetic']:
-            return 'register'
-
-        # Era
-        if tag_lower in ['archaic', 'obsolete', 'dated', 'historical']:
-            return 'era'
+        # Register, era, grammar and offensive tags are exact matches
+        category = TAG_CATEGORIES.get(tag_lower)
+        if category:
+            return category
 
         # Region
-        if any(r in tag_lower for r in ['british', 'us', 'american', 'australian', 'canadian', 'aave']):
+        if REGION_RE.search(tag_lower):
             return 'region'
 
-        # Grammar
-        if tag_lower in ['transitive', 'intransitive', 'countable', 'uncountable', 'plural', 'singular']:
-            return 'grammar'
-
-        # Offensive
-        if tag_lower in ['offensive', 'derogatory', 'pejorative', 'slur']:
-            return 'offensive'
-
         return 'other'
 
     def _process_synonyms(self, source_sense_id: int, synonyms: List) -> None:
@@ -168,32 +259,52 @@ class WiktextractImporter:
 
         entries_processed = 0
         entries_imported = 0
+        lines_skipped = 0
+
+        # A fresh marker means every line was filtered at download
+        english_only = is_english_only(filepath)
+        if english_only:
+            print("File is marked English-only; skipping language check")
+
+        loads = json_loads  # Local name avoids a global lookup per line
+        if HAS_SIMDJSON:
+            # Reuse one parser's buffers for every line; recursive parsing
+            # returns plain dicts, so nothing outlives the next parse
+            loads = partial(simdjson.Parser().parse, recursive=True)
+
+        for line in iter_lines(filepath):
+            if max_entries and entries_processed >= max_entries:
+                break
+
+            # Skip non-English lines without paying for a JSON decode
+            if not english_only and not may_be_english(line):
+                lines_skipped += 1
+                entries_processed += 1
+                continue
 
-        with open(filepath, 'r', encoding='utf-8') as f:
-            for line in f:
-                if max_entries and entries_processed >= max_entries:
-                    break
-
-                try:
-                    entry = json.loads(line)
-                    self.import_entry(entry)
-                    entries_imported += 1
+            try:
+                entry = loads(line)
+                self.import_entry(entry)
+                entries_imported += 1
 
-                    if entries_imported % 10 == 0:
-                        self.db.commit()  # Commit in batches
+                if entries_imported % COMMIT_EVERY == 0:
+                    self._flush()
+                    self.db.commit()  # Commit in batches
 
-                    if entries_imported % 50 == 0:
-                        print(f"  Imported {entries_imported} entries...")
+                if entries_imported % 50 == 0:
+                    print(f"  Imported {entries_imported} entries...")
 
-                except Exception as e:
-                    print(f"Error processing entry: {e}")
+            except Exception as e:
+                print(f"Error processing entry: {e}")
 
-                entries_processed += 1
+            entries_processed += 1
 
         # Final commit
+        self._flush()
         self.db.commit()
 
         print(f"\n[OK] Imported {entries_imported} entries")
+        print(f"Skipped before parsing: {lines_skipped:,}")
         print(f"Total words in database:")
         self.db._print_stats()
 
@@ -216,6 +327,7 @@ def main():
     with ThesaurusDB() as db:
         importer = WiktextractImporter(db)
         importer.import_file(filename, max_entries)
+        db.refresh_stats_cache()
 
 
 if __name__ == "__main__":
@@ -3,8 +3,12 @@ Search and query interface for Thesaurus+ database
 """
 
 from database import ThesaurusDB
+from itertools import groupby
 import sys
 
+# Section divider for CLI output
+BAR = '=' * 70
+
 def format_sense(sense: dict, tags: list, examples: list, index: int = None) -> str:
     """Format a sense for display"""
     output = []
@@ -38,49 +42,50 @@ def format_sense(sense: dict, tags: list, examples: list, index: int = None) ->
 def search_word(word: str):
     """Search for a word and display all its senses"""
     with ThesaurusDB() as db:
-        senses = db.search_word(word)
+        senses = db.search_word(word, group_by_pos=True)
 
         if not senses:
             print(f"\nWord '{word}' not found in database.")
             return
 
-        print(f"\n{'='*70}")
-        print(f" {word.upper()}")
-        print(f"{'='*70}\n")
+        # Output is collected and written once at the end
+        out = [f"\n{BAR}"]
+        out.append(f" {word.upper()}")
+        out.append(f"{BAR}\n")
 
-        # Group by POS
-        by_pos = {}
-        for sense in senses:
-            pos = sense['pos'] or 'unknown'
-            if pos not in by_pos:
-                by_pos[pos] = []
-            by_pos[pos].append(sense)
+        # Fetch tags and examples for every sense up front
+        sense_ids = [sense['sense_id'] for sense in senses]
+        tags_by_sense = db.get_sense_tags_bulk(sense_ids)
+        examples_by_sense = db.get_examples_bulk(sense_ids)
 
         # Display each POS group
-        for pos, pos_senses in by_pos.items():
-            print(f"\n--- {pos.upper()} ---\n")
+        for pos, group in groupby(senses, key=lambda s: s['pos'] or 'unknown'):
+            pos_senses = list(group)
+            out.append(f"\n--- {pos.upper()} ---\n")
 
             for i, sense in enumerate(pos_senses, 1):
                 # Get tags and examples
-                tags = db.get_sense_tags(sense['sense_id'])
-                examples = db.get_examples(sense['sense_id'])
+                tags = tags_by_sense[sense['sense_id']]
+                examples = examples_by_sense[sense['sense_id']]
 
-                # Format and print
-                print(format_sense(sense, tags, examples, index=i))
-                print()
+                # Format and queue for output
+                out.append(format_sense(sense, tags, examples, index=i))
+                out.append('')
 
             # Show etymology if available
             if pos_senses[0].get('etymology_text'):
                 etym = pos_senses[0]['etymology_text']
                 if len(etym) > 200:
                     etym = etym[:200] + "..."
-                print(f"Etymology: {etym}\n")
+                out.append(f"Etymology: {etym}\n")
+
+        sys.stdout.write('\n'.join(out) + '\n')
 
 
 def show_tags():
     """Display all tags in database"""
     with ThesaurusDB() as db:
-        cursor = db.execute(
+        cursor = db._plain_cursor().execute(
             """SELECT tag_name, category, COUNT(st.sense_id) as usage_count
                FROM tags t
                LEFT JOIN sense_tags st ON t.id = st.tag_id
@@ -88,9 +93,9 @@ def show_tags():
                ORDER BY t.category, t.tag_name"""
         )
 
-        print(f"\n{'='*70}")
+        print(f"\n{BAR}")
         print(" TAGS IN DATABASE")
-        print(f"{'='*70}\n")
+        print(f"{BAR}\n")
 
         current_category = None
         for row in cursor.fetchall():
@@ -108,17 +113,20 @@ def show_tags():
 def show_stats():
     """Display database statistics"""
     with ThesaurusDB() as db:
-        print(f"\n{'='*70}")
+        # Rows are only indexed by position
+        cursor = db._plain_cursor()
+
+        print(f"\n{BAR}")
         print(" DATABASE STATISTICS")
-        print(f"{'='*70}\n")
+        print(f"{BAR}\n")
 
         # Word count
-        cursor = db.execute("SELECT COUNT(*) FROM words")
+        cursor.execute("SELECT COUNT(*) FROM words")
         word_count = cursor.fetchone()[0]
         print(f"Total words: {word_count}")
 
         # Sense count
-        cursor = db.execute("SELECT COUNT(*) FROM senses")
+        cursor.execute("SELECT COUNT(*) FROM senses")
         sense_count = cursor.fetchone()[0]
         print(f"Total senses: {sense_count}")
 
@@ -127,18 +135,18 @@ def show_stats():
         print(f"Average senses per word: {avg_senses:.1f}")
 
         # Tag count
-        cursor = db.execute("SELECT COUNT(*) FROM tags")
+        cursor.execute("SELECT COUNT(*) FROM tags")
         tag_count = cursor.fetchone()[0]
         print(f"Total tags: {tag_count}")
 
         # Example count
-        cursor = db.execute("SELECT COUNT(*) FROM examples")
+        cursor.execute("SELECT COUNT(*) FROM examples")
         example_count = cursor.fetchone()[0]
         print(f"Total examples: {example_count}")
 
         # Top tags
         print(f"\nMost used tags:")
-        cursor = db.execute(
+        cursor.execute(
             """SELECT t.tag_name, COUNT(st.sense_id) as cnt
                FROM tags t
                JOIN sense_tags st ON t.id = st.tag_id
@@ -151,7 +159,7 @@ def show_stats():
 
         # List all words
         print(f"\nWords in database:")
-        cursor = db.execute("SELECT DISTINCT word FROM words ORDER BY word")
+        cursor.execute("SELECT DISTINCT word FROM words ORDER BY word")
         words = [row[0] for row in cursor.fetchall()]
         print(f"  {', '.join(words)}")
 
@@ -167,9 +175,9 @@ def list_words():
                ORDER BY w.word"""
         )
 
-        print(f"\n{'='*70}")
+        print(f"\n{BAR}")
         print(" WORDS IN DATABASE")
-        print(f"{'='*70}\n")
+        print(f"{BAR}\n")
 
         for row in cursor.fetchall():
             word = row[0]
@@ -3,10 +3,13 @@ Semantic Similarity Engine for Thesaurus+
 Uses NLP embeddings to find similar word senses based on definition text.
 """
 
+import hashlib
+import os
 import numpy as np
+from itertools import islice
 from database import ThesaurusDB
-import pickle
 from pathlib import Path
+from similarity_kernels import HAS_NUMBA, topk_cosine
 
 # Try to import sentence-transformers
 try:
@@ -17,6 +20,33 @@ except ImportError:
     print("WARNING: sentence-transformers not installed")
     print("Install with: pip install sentence-transformers")
 
+# Texts per model forward pass in generate_embeddings
+ENCODE_BATCH_SIZE = 256
+
+# Senses pulled from the cursor and encoded per call in generate_embeddings
+ENCODE_SHARD_SIZE = 8192
+
+# Rows compared per matrix product in build_semantic_relationships
+BLOCK_SIZE = 1024
+
+# Bytes of blake2b digest kept per cached embedding row
+HASH_SIZE = 16
+
+
+def text_hash(sense_id: int, text: str) -> bytes:
+    """Digest of a sense's embedded text, keyed by its id"""
+    h = hashlib.blake2b(b'%d\0' % sense_id, digest_size=HASH_SIZE)
+    h.update(text.encode())
+    return h.digest()
+
+
+def save_atomic(path: str, array: np.ndarray):
+    """Write an .npy file via a temp file so readers never see a partial one"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
 class SemanticSimilarityEngine:
     """Generate and compare semantic embeddings of word definitions"""
 
@@ -24,8 +54,13 @@ class SemanticSimilarityEngine:
         self.db = db
         self.model_name = model_name
         self.model = None
-        self.embeddings = {}  # sense_id -> embedding vector
-        self.embeddings_file = "embeddings.pkl"
+        self.embeddings_file = "embeddings.npy"  # (senses, dim) float32 matrix
+        self.ids_file = "sense_ids.npy"  # sense_id of each matrix row
+        self.hashes_file = "row_hashes.npy"  # text_hash() of each matrix row
+        self.matrix = None  # float32 embeddings, one row per sense
+        self.matrix_norm = None  # matrix rows scaled to unit length
+        self.ids = None  # sense_id of each matrix row
+        self.id_to_row = None  # sense_id -> matrix row, built on first lookup
 
     def load_model(self):
         """Load the sentence transformer model"""
@@ -37,94 +72,187 @@ class SemanticSimilarityEngine:
         self.model = SentenceTransformer(self.model_name)
         print("[OK] Model loaded")
 
+    def load_embeddings(self) -> bool:
+        """Memory-map cached embeddings; returns False if there is no cache"""
+        if not (Path(self.embeddings_file).exists() and Path(self.ids_file).exists()):
+            return False
+
+        print(f"Loading cached embeddings from {self.embeddings_file}")
+        self._set_matrix(np.load(self.embeddings_file, mmap_mode='r'), np.load(self.ids_file))
+        print(f"[OK] Loaded {len(self.ids)} cached embeddings")
+        return True
+
+    def _load_cache(self):
+        """Memory-map the cached matrix and its row hashes, or return None if unusable"""
+        if not all(Path(f).exists() for f in (self.embeddings_file, self.ids_file, self.hashes_file)):
+            return None
+
+        matrix = np.load(self.embeddings_file, mmap_mode='r')
+        hashes = np.load(self.hashes_file)
+        if len(matrix) != len(hashes):
+            return None
+        return matrix, hashes
+
+    def _iter_sense_texts(self, max_senses: int = None):
+        """Yield (sense_id, text) for every sense with a definition, streamed from the cursor"""
+        cursor = self.db.execute("""
+            SELECT s.id, w.word, s.pos, s.definition
+            FROM senses s
+            JOIN words w ON s.word_id = w.id
+            WHERE s.definition IS NOT NULL
+            ORDER BY s.id
+            LIMIT ?
+        """, (max_senses or -1,))
+
+        # Combine word, POS, and definition for better context, as
+        # "word (pos): definition"; the " (pos): " part is built once per POS
+        pos_infix = {}
+        for sense_id, word, pos, definition in cursor:
+            infix = pos_infix.get(pos)
+            if infix is None:
+                infix = pos_infix[pos] = f" ({pos or ''}): "
+            yield sense_id, word + infix + definition
+
     def generate_embeddings(self, max_senses: int = None, force_regenerate: bool = False):
         """
         Generate embeddings for all sense definitions.
 
+        Cached rows are reused when their sense's text is unchanged, so only
+        new or edited senses are encoded. Senses are streamed from the
+        database twice (once to hash, once to encode) rather than held in memory.
+
         Args:
             max_senses: Limit number of senses (for testing)
             force_regenerate: Regenerate even if cached file exists
         """
-        # Check if embeddings already exist
-        if Path(self.embeddings_file).exists() and not force_regenerate:
-            print(f"Loading cached embeddings from {self.embeddings_file}")
-            with open(self.embeddings_file, 'rb') as f:
-                self.embeddings = pickle.load(f)
-            print(f"[OK] Loaded {len(self.embeddings)} cached embeddings")
-            return
-
-        if not self.model:
-            self.load_model()
-
-        print("\nGenerating embeddings for word sense definitions...")
-
-        # Get all senses with definitions
-        cursor = self.db.execute("""
-            SELECT s.id, w.word, s.pos, s.definition
-            FROM senses s
-            JOIN words w ON s.word_id = w.id
-            WHERE s.definition IS NOT NULL
-            ORDER BY s.id
-        """)
+        # Hash every sense's text; only ids and digests are kept
+        sense_ids = []
+        digests = bytearray()
+        for sense_id, text in self._iter_sense_texts(max_senses):
+            sense_ids.append(sense_id)
+            digests += text_hash(sense_id, text)
 
-        senses = cursor.fetchall()
-        if max_senses:
-            senses = senses[:max_senses]
+        if not sense_ids:
+            print("No sense definitions to embed.")
+            return
 
-        print(f"Processing {len(senses)} word senses...")
+        ids = np.asarray(sense_ids, dtype=np.int64)
+        hashes = np.frombuffer(bytes(digests), dtype=np.uint8).reshape(-1, HASH_SIZE)
 
-        # Prepare texts for embedding
-        texts = []
-        sense_ids = []
+        # Check if embeddings already exist for exactly these texts
+        cache = None if force_regenerate else self._load_cache()
+        if cache is not None and np.array_equal(cache[1], hashes):
+            print(f"Loading cached embeddings from {self.embeddings_file}")
+            self._set_matrix(cache[0], ids, normalized=True)
+            print(f"[OK] Loaded {len(ids)} cached embeddings")
+            return
 
-        for row in senses:
-            sense_id = row[0]
-            word = row[1]
-            pos = row[2] or ''
-            definition = row[3]
+        # Find the rows that can be copied from the cache
+        cached_rows = {}
+        if cache is not None:
+            cached_rows = {digest.tobytes(): row for row, digest in enumerate(cache[1])}
+        reuse = [cached_rows.get(digest.tobytes()) for digest in hashes]
+        fresh = [i for i, row in enumerate(reuse) if row is not None]
+        stale_count = len(ids) - len(fresh)
 
-            # Combine word, POS, and definition for better context
-            text = f"{word} ({pos}): {definition}"
-            texts.append(text)
-            sense_ids.append(sense_id)
+        print("\nGenerating embeddings for word sense definitions...")
+        print(f"Processing {len(ids)} word senses "
+              f"({len(fresh)} cached, {stale_count} to encode)...")
+
+        matrix = None
+        if cache is not None:
+            matrix = np.empty((len(ids), cache[0].shape[1]), dtype=np.float32)
+            if fresh:
+                matrix[fresh] = cache[0][[reuse[i] for i in fresh]]
+
+        # Release the old mapping before its file is replaced
+        cache = None
+
+        if stale_count:
+            if not self.model:
+                self.load_model()
+
+            # Encode the uncached senses shard by shard straight from the
+            # cursor. The library batches within each call and returns
+            # unit-length rows, so cosine similarity is a dot product.
+            print(f"Encoding in batches of {ENCODE_BATCH_SIZE}...")
+            texts = self._iter_sense_texts(max_senses)
+            encoded_count = 0
+            for start in range(0, len(ids), ENCODE_SHARD_SIZE):
+                shard = list(islice(texts, ENCODE_SHARD_SIZE))
+                stale = [start + i for i in range(len(shard)) if reuse[start + i] is None]
+                if not stale:
+                    continue
+
+                encoded = self.model.encode([shard[i - start][1] for i in stale],
+                                            batch_size=ENCODE_BATCH_SIZE, convert_to_numpy=True,
+                                            normalize_embeddings=True, show_progress_bar=False)
+                if matrix is None:
+                    matrix = np.empty((len(ids), encoded.shape[1]), dtype=np.float32)
+                matrix[stale] = encoded
+
+                encoded_count += len(stale)
+                print(f"  Encoded {encoded_count}/{stale_count} senses...")
+
+        print(f"\n[OK] Generated {len(ids)} embeddings")
+
+        # Cache embeddings. The hashes are dropped first and written last, so
+        # an interrupted save leaves no hashes and the next run re-encodes
+        print(f"Saving embeddings to {self.embeddings_file}...")
+        Path(self.hashes_file).unlink(missing_ok=True)
+        save_atomic(self.embeddings_file, matrix)
+        save_atomic(self.ids_file, ids)
+        save_atomic(self.hashes_file, hashes)
+        print("[OK] Embeddings cached")
 
-        # Generate embeddings in batches
-        batch_size = 32
-        print(f"Encoding in batches of {batch_size}...")
+        self._set_matrix(matrix, ids, normalized=True)
 
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i:i+batch_size]
-            batch_ids = sense_ids[i:i+batch_size]
+    def _set_matrix(self, matrix: np.ndarray, ids: np.ndarray, normalized: bool = False):
+        """
+        Install an embedding matrix and derive its unit-length rows.
 
-            # Encode batch
-            embeddings = self.model.encode(batch_texts, show_progress_bar=False)
+        Norms are computed here once, never per comparison. Pass normalized
+        when the rows are known to be unit length (generate_embeddings always
+        encodes normalized) to skip even that pass over the matrix.
+        """
+        # Scans run as float32 BLAS products: numpy has no int8 matmul, so
+        # smaller dtypes would be slower here, and wider ones double the
+        # memory traffic. A float32 mmap passes through without a copy.
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
 
-            # Store embeddings
-            for sense_id, embedding in zip(batch_ids, embeddings):
-                self.embeddings[sense_id] = embedding
+        self.matrix = matrix
+        self.ids = ids
+        self.id_to_row = None
 
-            if (i + batch_size) % 1000 == 0:
-                print(f"  Encoded {i + batch_size}/{len(texts)} senses...")
+        if normalized:
+            self.matrix_norm = matrix
+            return
 
-        print(f"\n[OK] Generated {len(self.embeddings)} embeddings")
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        if np.allclose(norms, 1.0, atol=1e-4):
+            # Already normalized; use the (possibly memory-mapped) matrix as is
+            self.matrix_norm = matrix
+        else:
+            norms[norms == 0] = 1.0
+            self.matrix_norm = matrix / norms
 
-        # Cache embeddings
-        print(f"Saving embeddings to {self.embeddings_file}...")
-        with open(self.embeddings_file, 'wb') as f:
-            pickle.dump(self.embeddings, f)
-        print("[OK] Embeddings cached")
+    def _row(self, sense_id: int):
+        """Return the matrix row of a sense, or None if it has no embedding"""
+        if self.id_to_row is None:
+            if self.ids is None:
+                return None
+            self.id_to_row = {sid: row for row, sid in enumerate(self.ids.tolist())}
+        return self.id_to_row.get(sense_id)
 
     def compute_similarity(self, sense_id1: int, sense_id2: int) -> float:
         """Compute cosine similarity between two sense embeddings"""
-        if sense_id1 not in self.embeddings or sense_id2 not in self.embeddings:
+        row1 = self._row(sense_id1)
+        row2 = self._row(sense_id2)
+        if row1 is None or row2 is None:
             return 0.0
 
-        emb1 = self.embeddings[sense_id1]
-        emb2 = self.embeddings[sense_id2]
-
-        # Cosine similarity
-        similarity = np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2))
-        return float(similarity)
+        # Cosine similarity of unit vectors is their dot product
+        return float(self.matrix_norm[row1] @ self.matrix_norm[row2])
 
     def find_similar_senses(self, sense_id: int, min_similarity: float = 0.7,
                            max_results: int = 50) -> list:
@@ -133,28 +261,43 @@ class SemanticSimilarityEngine:
 
         Returns list of (sense_id, similarity_score) tuples
         """
-        if sense_id not in self.embeddings:
+        row = self._row(sense_id)
+        if row is None:
             return []
 
-        target_embedding = self.embeddings[sense_id]
-        similarities = []
-
-        # Compare with all other senses
-        for other_id, other_embedding in self.embeddings.items():
-            if other_id == sense_id:
-                continue
-
-            # Compute cosine similarity
-            similarity = np.dot(target_embedding, other_embedding) / \
-                        (np.linalg.norm(target_embedding) * np.linalg.norm(other_embedding))
-
-            if similarity >= min_similarity:
-                similarities.append((other_id, float(similarity)))
-
-        # Sort by similarity (descending)
-        similarities.sort(key=lambda x: x[1], reverse=True)
-
-        return similarities[:max_results]
+        if HAS_NUMBA:
+            # Compiled scan that keeps only the top matches as it goes
+            rows, scores = topk_cosine(self.matrix_norm, self.matrix_norm[row],
+                                       max_results, min_similarity, skip=row)
+            return list(zip(self.ids[rows].tolist(), scores.tolist()))
+
+        # Compare with all other senses in one matrix-vector product
+        sims = self.matrix_norm @ self.matrix_norm[row]
+        sims[row] = -np.inf
+
+        rows, scores = self._top_matches(sims, min_similarity, max_results)
+        return list(zip(self.ids[rows].tolist(), scores.tolist()))
+
+    @staticmethod
+    def _top_matches(sims: np.ndarray, min_similarity: float, max_results: int):
+        """Return the rows of sims at or above min_similarity, best first, and their scores"""
+        candidates = np.flatnonzero(sims >= min_similarity)
+        scores = sims[candidates]
+
+        if len(candidates) > max_results:
+            # Select the best max_results in linear time so only they get
+            # sorted. Ties at the cutoff score go to the lowest rows, as they
+            # would in a full stable sort.
+            kth = len(scores) - max_results
+            cutoff = np.partition(scores, kth)[kth] if max_results > 0 else np.inf
+            keep = scores > cutoff
+            ties = np.flatnonzero(scores == cutoff)[:max_results - np.count_nonzero(keep)]
+            keep[ties] = True
+            candidates, scores = candidates[keep], scores[keep]
+
+        # Sort by similarity (descending); ties keep embedding order
+        order = np.argsort(-scores, kind='stable')
+        return candidates[order], scores[order]
 
     def build_semantic_relationships(self, min_similarity: float = 0.75,
                                     max_synonyms_per_sense: int = 30):
@@ -172,52 +315,44 @@ class SemanticSimilarityEngine:
         print(f"Min similarity threshold: {min_similarity}")
         print(f"Max synonyms per sense: {max_synonyms_per_sense}")
 
-        if not self.embeddings:
+        if self.ids is None or not len(self.ids):
             print("Error: No embeddings loaded. Run generate_embeddings() first.")
             return
 
+        # Inserts rely on the unique index to skip pairs that already exist
+        self.db.ensure_indexes()
+
+        matrix = self.matrix_norm
+        sense_ids = self.ids.tolist()
+        total = len(sense_ids)
         relationships_added = 0
-        senses_processed = 0
-
-        # Process each sense
-        for sense_id in self.embeddings.keys():
-            # Find similar senses
-            similar = self.find_similar_senses(
-                sense_id,
-                min_similarity=min_similarity,
-                max_results=max_synonyms_per_sense
-            )
-
-            # Add relationships
-            for similar_id, similarity in similar:
-                # Check if relationship already exists
-                cursor = self.db.execute("""
-                    SELECT id FROM relationships
-                    WHERE source_sense_id = ? AND target_sense_id = ?
-                    AND relationship_type = 'synonym'
-                """, (sense_id, similar_id))
-
-                if cursor.fetchone():
-                    continue  # Already exists
-
-                # Add semantic similarity relationship
-                self.db.insert_relationship(
-                    sense_id,
-                    similar_id,
-                    'synonym',
-                    similarity  # Use cosine similarity as score
-                )
-                relationships_added += 1
-
-            senses_processed += 1
-
-            # Commit in batches
-            if senses_processed % 100 == 0:
-                self.db.commit()
-                print(f"  Processed {senses_processed}/{len(self.embeddings)} senses, "
-                      f"added {relationships_added} relationships")
-
-        # Final commit
+
+        # Compare a block of senses against all senses per matrix product
+        for start in range(0, total, BLOCK_SIZE):
+            sims = matrix[start:start + BLOCK_SIZE] @ matrix.T
+
+            # Exclude each sense from its own matches
+            rows = np.arange(len(sims))
+            sims[rows, rows + start] = -np.inf
+
+            pending = []
+            for offset, row_sims in enumerate(sims):
+                sense_id = sense_ids[start + offset]
+                similar_rows, scores = self._top_matches(row_sims, min_similarity,
+                                                         max_synonyms_per_sense)
+
+                # Use cosine similarity as score
+                for similar_row, similarity in zip(similar_rows.tolist(), scores.tolist()):
+                    pending.append((sense_id, sense_ids[similar_row], 'synonym', similarity))
+
+            relationships_added += self.db.insert_relationships(pending)
+
+            senses_processed = min(start + BLOCK_SIZE, total)
+            print(f"  Processed {senses_processed}/{total} senses, "
+                  f"added {relationships_added} relationships")
+
+        # All blocks are written in one transaction: a single commit (and
+        # fsync) at the end, and an interrupted build leaves nothing behind
         self.db.commit()
 
         print(f"\n[OK] Added {relationships_added} semantic similarity relationships")
@@ -264,6 +399,7 @@ def main():
             min_similarity=min_similarity,
             max_synonyms_per_sense=30
         )
+        db.refresh_stats_cache()
 
         print("\n[OK] Semantic similarity relationships built!")
         print("\nTest with:")
@@ -0,0 +1,73 @@
+"""
+Compiled kernels for the semantic similarity scan.
+Fuses the dot products, threshold and top-k selection into one pass.
+"""
+
+import numpy as np
+
+# numba compiles the scan to a parallel native loop; without it the
+# similarity engine falls back to numpy matrix products
+try:
+    from numba import get_num_threads, njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+if HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _topk_chunks(matrix, target, k, threshold, skip, chunks):
+        """Best k rows of each contiguous chunk of matrix, as (rows, scores) arrays"""
+        n, dim = matrix.shape
+        rows = np.full((chunks, k), -1, dtype=np.int64)
+        scores = np.full((chunks, k), -np.inf, dtype=np.float32)
+        step = (n + chunks - 1) // chunks
+
+        for c in prange(chunks):
+            count = 0
+            for i in range(c * step, min(n, (c + 1) * step)):
+                if i == skip:
+                    continue
+
+                s = np.float32(0.0)
+                for d in range(dim):
+                    s += matrix[i, d] * target[d]
+
+                if s < threshold or (count == k and s <= scores[c, k - 1]):
+                    continue
+
+                # Insertion into the descending list; equal scores keep
+                # the earlier row ahead
+                j = count if count < k else k - 1
+                while j > 0 and scores[c, j - 1] < s:
+                    scores[c, j] = scores[c, j - 1]
+                    rows[c, j] = rows[c, j - 1]
+                    j -= 1
+                scores[c, j] = s
+                rows[c, j] = i
+                if count < k:
+                    count += 1
+
+        return rows, scores
+
+
+def topk_cosine(matrix: np.ndarray, target: np.ndarray, k: int,
+                threshold: float, skip: int = -1):
+    """
+    Find the rows of a unit-length float32 matrix closest to target.
+
+    Returns (rows, scores) arrays of at most k rows scoring at least
+    threshold, best first, leaving out row `skip`.
+    """
+    if k <= 0 or not len(matrix):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    chunks = min(get_num_threads(), len(matrix))
+    rows, scores = _topk_chunks(matrix, target, k, np.float32(threshold), skip, chunks)
+
+    # Merge the per-chunk winners; ties go to the lower row
+    rows, scores = rows.ravel(), scores.ravel()
+    found = rows >= 0
+    rows, scores = rows[found], scores[found]
+    order = np.lexsort((rows, -scores))[:k]
+    return rows[order], scores[order]
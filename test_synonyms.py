@@ -5,6 +5,9 @@ Test and display synonym relationships
 from database import ThesaurusDB
 import sys
 
+# Section divider for CLI output
+BAR = '=' * 70
+
 def show_synonyms_for_word(word: str, min_similarity: float = 0.0):
     """Show all synonyms for a word with their similarity scores"""
     with ThesaurusDB() as db:
@@ -15,28 +18,32 @@ def show_synonyms_for_word(word: str, min_similarity: float = 0.0):
             print(f"\nWord '{word}' not found in database.")
             return
 
-        print(f"\n{'='*70}")
-        print(f" SYNONYMS FOR: {word.upper()}")
-        print(f"{'='*70}\n")
+        # Output is collected and written once at the end
+        out = [f"\n{BAR}"]
+        out.append(f" SYNONYMS FOR: {word.upper()}")
+        out.append(f"{BAR}\n")
 
         total_synonyms = 0
 
+        # Synonyms above the threshold for every sense, in one query
+        synonyms_by_sense = db.get_synonyms_bulk([sense['sense_id'] for sense in senses],
+                                                 min_similarity)
+
         # For each sense, show its synonyms
         for sense in senses:
             sense_id = sense['sense_id']
             pos = sense['pos'] or 'unknown'
             definition = sense['definition']
 
-            # Get synonyms for this sense
-            synonyms = db.get_synonyms(sense_id, min_similarity)
+            synonyms = synonyms_by_sense[sense_id]
 
             if not synonyms:
                 continue
 
             # Display sense header
-            print(f"{word} ({pos})")
-            print(f"  Definition: {definition[:80]}...")
-            print(f"  Synonyms ({len(synonyms)}):")
+            out.append(f"{word} ({pos})")
+            out.append(f"  Definition: {definition[:80]}...")
+            out.append(f"  Synonyms ({len(synonyms)}):")
 
             # Display synonyms sorted by similarity
             for syn in synonyms:
@@ -46,67 +53,104 @@ def show_synonyms_for_word(word: str, min_similarity: float = 0.0):
                 syn_pos = syn['pos'] or '?'
                 syn_def = syn['definition'][:50] + "..." if len(syn['definition']) > 50 else syn['definition']
 
-                print(f"    [{score_str}] {syn_word} ({syn_pos}) - {syn_def}")
+                out.append(f"    [{score_str}] {syn_word} ({syn_pos}) - {syn_def}")
 
-            print()
+            out.append('')
             total_synonyms += len(synonyms)
 
-        print(f"Total synonyms found: {total_synonyms}\n")
+        out.append(f"Total synonyms found: {total_synonyms}\n")
+        sys.stdout.write('\n'.join(out) + '\n')
 
 
 def show_synonym_network(word: str, depth: int = 2):
     """Show synonym network expanding from a word"""
     with ThesaurusDB() as db:
-        print(f"\n{'='*70}")
-        print(f" SYNONYM NETWORK: {word.upper()} (depth {depth})")
-        print(f"{'='*70}\n")
+        # Output is collected and written once at the end
+        out = [f"\n{BAR}",
+               f" SYNONYM NETWORK: {word.upper()} (depth {depth})",
+               f"{BAR}\n"]
 
         # Get starting word
         senses = db.search_word(word)
         if not senses:
-            print(f"Word '{word}' not found.")
+            out.append(f"Word '{word}' not found.")
+            sys.stdout.write('\n'.join(out) + '\n')
             return
 
         # Use first sense
         sense_id = senses[0]['sense_id']
 
-        # Get direct synonyms
-        synonyms_l1 = db.get_synonyms(sense_id, min_similarity=0.7)
-
-        print(f"{word}")
-        for syn in synonyms_l1[:10]:  # Limit to 10
-            score = syn['similarity_score'] or 0
-            print(f"  -> [{score:.2f}] {syn['word']}")
-
-            if depth > 1:
-                # Get second-level synonyms
-                cursor = db.execute("""
-                    SELECT w.word, s.id as sense_id
-                    FROM words w
-                    JOIN senses s ON w.id = s.word_id
-                    WHERE w.word = ?
-                    LIMIT 1
-                """, (syn['word'],))
-
-                row = cursor.fetchone()
-                if row:
-                    syn_sense_id = row[1]
-                    synonyms_l2 = db.get_synonyms(syn_sense_id, min_similarity=0.7)
-
-                    for syn2 in synonyms_l2[:5]:  # Limit to 5
-                        score2 = syn2['similarity_score'] or 0
-                        print(f"      -> [{score2:.2f}] {syn2['word']}")
+        # Walk the synonym graph to the requested depth in one query. Each row
+        # carries its path (",1,4,9,") so senses already on it are skipped,
+        # and the per-branch limits (10 direct, 5 below) are applied inside
+        # the recursion rather than after it.
+        cursor = db.execute("""
+            WITH RECURSIVE walk(sense_id, path, parent_path, word, depth, score, rel_id) AS (
+                SELECT * FROM (
+                    SELECT r.target_sense_id,
+                           ',' || r.source_sense_id || ',' || r.target_sense_id || ',',
+                           ',' || r.source_sense_id || ',',
+                           w.word, 1, r.similarity_score, r.id
+                    FROM relationships r
+                    JOIN senses s ON s.id = r.target_sense_id
+                    JOIN words w ON w.id = s.word_id
+                    WHERE r.source_sense_id = ?1
+                    AND r.target_sense_id != r.source_sense_id
+                    AND r.relationship_type = 'synonym'
+                    AND (r.similarity_score >= ?3 OR r.similarity_score IS NULL)
+                    ORDER BY r.similarity_score DESC, r.id
+                    LIMIT 10
+                )
+                UNION ALL
+                SELECT r.target_sense_id, walk.path || r.target_sense_id || ',', walk.path,
+                       w.word, walk.depth + 1, r.similarity_score, r.id
+                FROM walk
+                JOIN relationships r ON r.id IN (
+                    SELECT id FROM relationships
+                    WHERE source_sense_id = walk.sense_id
+                    AND relationship_type = 'synonym'
+                    AND (similarity_score >= ?3 OR similarity_score IS NULL)
+                    AND instr(walk.path, ',' || target_sense_id || ',') = 0
+                    ORDER BY similarity_score DESC, id
+                    LIMIT 5
+                )
+                JOIN senses s ON s.id = r.target_sense_id
+                JOIN words w ON w.id = s.word_id
+                WHERE walk.depth < ?2
+            )
+            SELECT path, parent_path, word, score
+            FROM walk
+            ORDER BY depth, score DESC, rel_id
+        """, (sense_id, depth, 0.7))
+
+        # Group by the path of the parent, best scores first
+        children = {}
+        for path, parent_path, syn_word, score in cursor.fetchall():
+            children.setdefault(parent_path, []).append((path, syn_word, score))
+
+        def show_level(parent_path, level):
+            indent = '  ' + '    ' * (level - 1)
+            for path, syn_word, score in children.get(parent_path, []):
+                out.append(f"{indent}-> [{score or 0:.2f}] {syn_word}")
+                show_level(path, level + 1)
+
+        out.append(f"{word}")
+        show_level(f",{sense_id},", 1)
+        sys.stdout.write('\n'.join(out) + '\n')
 
 
 def analyze_similarity_distribution():
     """Analyze the distribution of similarity scores"""
     with ThesaurusDB() as db:
-        print(f"\n{'='*70}")
+        # Rows are only indexed by position
+        cursor = db._plain_cursor()
+
+        print(f"\n{BAR}")
         print(" SIMILARITY SCORE DISTRIBUTION")
-        print(f"{'='*70}\n")
+        print(f"{BAR}\n")
 
         # Get distribution
-        cursor = db.execute("""
+        cursor.execute("""
             SELECT
                 CASE
                     WHEN similarity_score >= 0.9 THEN '0.90-1.00 (Perfect)'
@@ -129,7 +173,7 @@ def analyze_similarity_distribution():
             print(f"  {range_name:<25} {count:>6} relationships")
 
         # Total
-        cursor = db.execute("""
+        cursor.execute("""
             SELECT COUNT(*) FROM relationships WHERE relationship_type = 'synonym'
         """)
         total = cursor.fetchone()[0]
@@ -139,11 +183,11 @@ def analyze_similarity_distribution():
 def find_highly_connected_words():
     """Find words with the most synonyms"""
     with ThesaurusDB() as db:
-        print(f"\n{'='*70}")
+        print(f"\n{BAR}")
         print(" MOST HIGHLY CONNECTED WORDS")
-        print(f"{'='*70}\n")
+        print(f"{BAR}\n")
 
-        cursor = db.execute("""
+        cursor = db._plain_cursor().execute("""
             SELECT w.word, s.pos, COUNT(r.id) as synonym_count
             FROM words w
             JOIN senses s ON w.id = s.word_id
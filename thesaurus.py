@@ -4,14 +4,18 @@ This is the core user-facing tool
 """
 
 from database import ThesaurusDB
+from itertools import groupby
 import sys
 
+# Section divider for CLI output
+BAR = '=' * 70
+
 def search_thesaurus(word: str, filter_tags: list = None, min_similarity: float = 0.5):
     """
     Main thesaurus search - shows word definitions and synonyms
     """
     with ThesaurusDB() as db:
-        senses = db.search_word(word)
+        senses = db.search_word(word, group_by_pos=True)
 
         if not senses:
             print(f"\n'{word}' not found in database.")
@@ -20,30 +24,31 @@ def search_thesaurus(word: str, filter_tags: list = None, min_similarity: float
             print("  - Try a simpler form (e.g., 'run' instead of 'running')")
             return
 
-        print(f"\n{'='*70}")
-        print(f" {word.upper()}")
-        print(f"{'='*70}\n")
+        # Output is collected and written once at the end
+        out = [f"\n{BAR}"]
+        out.append(f" {word.upper()}")
+        out.append(f"{BAR}\n")
 
-        # Group by POS
-        by_pos = {}
-        for sense in senses:
-            pos = sense['pos'] or 'unknown'
-            if pos not in by_pos:
-                by_pos[pos] = []
-            by_pos[pos].append(sense)
+        # Fetch tags, examples and synonyms for every sense up front
+        sense_ids = [sense['sense_id'] for sense in senses]
+        tags_by_sense = db.get_sense_tags_bulk(sense_ids)
+        examples_by_sense = db.get_examples_bulk(sense_ids)
+        synonyms_by_sense = db.get_synonyms_bucketed_bulk(sense_ids, min_similarity)
+        synonym_counts = db.get_synonym_counts_bulk(sense_ids, min_similarity)
 
         # Display each POS
-        for pos, pos_senses in by_pos.items():
-            print(f"--- {pos.upper()} ---\n")
+        for pos, group in groupby(senses, key=lambda s: s['pos'] or 'unknown'):
+            pos_senses = list(group)
+            out.append(f"--- {pos.upper()} ---\n")
 
             for i, sense in enumerate(pos_senses, 1):
                 sense_id = sense['sense_id']
 
                 # Definition
-                print(f"{i}. {sense['definition']}")
+                out.append(f"{i}. {sense['definition']}")
 
                 # Tags
-                tags = db.get_sense_tags(sense_id)
+                tags = tags_by_sense[sense_id]
                 if tags:
                     tag_list = []
                     for tag in tags:
@@ -53,47 +58,49 @@ def search_thesaurus(word: str, filter_tags: list = None, min_similarity: float
                             tag_list.append(f"{tag_name}")
 
                     if tag_list:
-                        print(f"   Tags: {', '.join(tag_list)}")
+                        out.append(f"   Tags: {', '.join(tag_list)}")
 
                 # Examples
-                examples = db.get_examples(sense_id)
+                examples = examples_by_sense[sense_id]
                 if examples:
-                    print(f"   Example: \"{examples[0][:80]}...\"" if len(examples[0]) > 80 else f"   Example: \"{examples[0]}\"")
+                    out.append(f"   Example: \"{examples[0][:80]}...\"" if len(examples[0]) > 80 else f"   Example: \"{examples[0]}\"")
 
                 # SYNONYMS - The key feature!
-                synonyms = db.get_synonyms(sense_id, min_similarity)
+                # Synonyms come grouped by similarity score, capped per group;
+                # the count also covers unscored synonyms
+                if synonym_counts[sense_id]:
+                    synonyms = synonyms_by_sense[sense_id]
 
-                if synonyms:
-                    # Group synonyms by similarity score
-                    high_sim = [s for s in synonyms if s['similarity_score'] and s['similarity_score'] >= 0.85]
-                    med_sim = [s for s in synonyms if s['similarity_score'] and 0.70 <= s['similarity_score'] < 0.85]
-                    low_sim = [s for s in synonyms if s['similarity_score'] and s['similarity_score'] < 0.70]
+                    out.append(f"\n   SYNONYMS:")
 
-                    print(f"\n   SYNONYMS:")
+                    if synonyms['direct']:
+                        syn_words = [s['word'] for s in synonyms['direct']]
+                        out.append(f"     Direct: {', '.join(syn_words)}")
 
-                    if high_sim:
-                        syn_words = [s['word'] for s in high_sim[:15]]
-                        print(f"     Direct: {', '.join(syn_words)}")
+                    if synonyms['related']:
+                        syn_words = [s['word'] for s in synonyms['related']]
+                        out.append(f"     Related: {', '.join(syn_words)}")
 
-                    if med_sim:
-                        syn_words = [s['word'] for s in med_sim[:10]]
-                        print(f"     Related: {', '.join(syn_words)}")
+                    if synonyms['contextual']:
+                        syn_words = [s['word'] for s in synonyms['contextual']]
+                        out.append(f"     Contextual: {', '.join(syn_words)}")
 
-                    if low_sim:
-                        syn_words = [s['word'] for s in low_sim[:5]]
-                        print(f"     Contextual: {', '.join(syn_words)}")
-
-                print()
+                out.append('')
 
             # Etymology
             if pos_senses[0].get('etymology_text'):
                 etym = pos_senses[0]['etymology_text']
                 if len(etym) > 150:
                     etym = etym[:150] + "..."
+                # Output is written in one go, so check up front that the
+                # console can encode the etymology
                 try:
-                    print(f"Etymology: {etym}\n")
+                    etym.encode(sys.stdout.encoding or 'utf-8')
+                    out.append(f"Etymology: {etym}\n")
                 except UnicodeEncodeError:
-                    print(f"Etymology: [unicode text]\n")
+                    out.append(f"Etymology: [unicode text]\n")
+
+        sys.stdout.write('\n'.join(out) + '\n')
 
 
 def filter_by_tone(word: str, tone: str):
@@ -105,38 +112,16 @@ def filter_by_tone(word: str, tone: str):
             print(f"\n'{word}' not found.")
             return
 
-        print(f"\n{'='*70}")
+        print(f"\n{BAR}")
         print(f" {word.upper()} - {tone.upper()} SYNONYMS")
-        print(f"{'='*70}\n")
+        print(f"{BAR}\n")
+
+        # Synonyms whose target sense carries the tone tag, for all senses at once
+        sense_ids = [sense['sense_id'] for sense in senses]
+        toned = db.get_synonyms_with_tag_bulk(sense_ids, tone.lower(), 0.5)
 
         for sense in senses:
-            sense_id = sense['sense_id']
-            synonyms = db.get_synonyms(sense_id, 0.5)
-
-            if not synonyms:
-                continue
-
-            # Filter synonyms by tone
-            filtered_syns = []
-            for syn in synonyms:
-                # Get tags for synonym sense
-                # This requires looking up the target sense's tags
-                cursor = db.execute("""
-                    SELECT w.word, s.id
-                    FROM words w
-                    JOIN senses s ON w.id = s.word_id
-                    WHERE w.word = ?
-                    LIMIT 1
-                """, (syn['word'],))
-
-                row = cursor.fetchone()
-                if row:
-                    syn_sense_id = row[1]
-                    syn_tags = db.get_sense_tags(syn_sense_id)
-                    tag_names = [t['tag_name'] for t in syn_tags]
-
-                    if tone.lower() in tag_names:
-                        filtered_syns.append(syn['word'])
+            filtered_syns = [syn['word'] for syn in toned[sense['sense_id']]]
 
             if filtered_syns:
                 print(f"{sense['definition'][:60]}...")
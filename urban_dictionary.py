@@ -3,20 +3,179 @@ Urban Dictionary Integration for Thesaurus+
 Fetches modern slang definitions and links them to existing Wiktionary entries.
 """
 
+import asyncio
 import requests
 import json
+import random
+import re
+import sqlite3
 import time
 from database import ThesaurusDB
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# aiohttp lets integrate_existing_words keep several requests in flight;
+# without it words are fetched one at a time
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+# Concurrent requests, and the overall request rate they share
+MAX_CONCURRENT_REQUESTS = 8
+REQUESTS_PER_SECOND = 4
+
+# Seconds between requests when fetching one word at a time
+REQUEST_INTERVAL = 1.0
+
+# Seconds before a single API request is abandoned
+REQUEST_TIMEOUT = 10
+
+# Seconds a resolved API address is reused by the concurrent fetcher
+DNS_CACHE_TTL = 300
+
+# Words integrated more recently than this many days are skipped on re-runs
+RESUME_DAYS = 30
+
+# Random rowids probed per word wanted when sampling words to process
+SAMPLE_PROBES_PER_WORD = 4
+
+# API responses are cached on disk so re-runs skip the network; entries
+# older than CACHE_MAX_AGE seconds are fetched again
+UD_CACHE_FILE = "ud_cache.sqlite"
+CACHE_MAX_AGE = 7 * 24 * 3600
+
+# Identifies the client to the API instead of the library default
+USER_AGENT = 'parlance/1.0'
+
+# Responses retried with backoff by both fetch paths; a Retry-After header
+# from the server takes precedence over the backoff
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Retries per request, and the base delay (seconds) that doubles each retry
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+
+# [bracketed] internal links in UD text
+LINK_RE = re.compile(r'\[([^\]]+)\]')
+
+
+def retry_delay(attempt: int, retry_after: str = None) -> float:
+    """Seconds to wait before retrying after the given (0-based) failed attempt"""
+    if retry_after:
+        # Retry-After is either a number of seconds or an HTTP date
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    return RETRY_BACKOFF * 2 ** attempt
+
+
+def markers_re(markers: list) -> re.Pattern:
+    """Compile a pattern matching any of the given substrings"""
+    return re.compile('|'.join(map(re.escape, markers)))
+
+
+# Substrings of a lowercased entry that earn each slang tag
+INTERNET_MARKERS_RE = markers_re(['internet', 'meme', 'viral', 'online', 'twitter',
+                                  'tiktok', 'instagram', 'reddit', 'social media'])
+GEN_Z_MARKERS_RE = markers_re(['gen z', 'zoomer', 'tiktok', 'no cap', 'fr fr'])
+AAVE_MARKERS_RE = markers_re(['aave', 'black', 'african american', 'hood'])
+VULGAR_MARKERS_RE = markers_re(['sex', 'fuck', 'shit'])
+
+
+class RateLimiter:
+    """Spaces out request starts so concurrent fetches share one rate cap"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+
+    async def wait(self):
+        """Sleep until this caller's slot comes up"""
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def pause(self, seconds: float):
+        """Hold back every caller's next slot for at least the given time"""
+        now = asyncio.get_running_loop().time()
+        self._next_slot = max(self._next_slot, now + seconds)
+
+
+class ResponseCache:
+    """On-disk cache of Urban Dictionary API responses, keyed by lowercased word"""
+
+    def __init__(self, path: str = UD_CACHE_FILE, max_age: int = CACHE_MAX_AGE):
+        self.max_age = max_age
+        self.conn = sqlite3.connect(path)
+        # Every fetched word is its own commit; under WAL with NORMAL sync
+        # those commits skip the fsync
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS ud_cache (
+                word TEXT PRIMARY KEY,
+                fetched_at INTEGER,
+                payload BLOB
+            )
+        """)
+
+    def get(self, word: str, allow_stale: bool = False):
+        """
+        Return the cached entry list for a word, or None if missing.
+
+        Expired entries also count as missing unless allow_stale is set.
+        """
+        oldest = 0 if allow_stale else int(time.time()) - self.max_age
+        cursor = self.conn.execute("""
+            SELECT payload FROM ud_cache WHERE word = ? AND fetched_at > ?
+        """, (word.lower(), oldest))
+
+        row = cursor.fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, word: str, entries: list):
+        """Store a freshly fetched entry list"""
+        self.conn.execute("""
+            INSERT OR REPLACE INTO ud_cache (word, fetched_at, payload)
+            VALUES (?, ?, ?)
+        """, (word.lower(), int(time.time()), json.dumps(entries)))
+        self.conn.commit()
+
 
 class UrbanDictionaryIntegrator:
     """Integrate Urban Dictionary slang into the thesaurus"""
 
-    def __init__(self, db: ThesaurusDB):
+    def __init__(self, db: ThesaurusDB, cache_file: str = UD_CACHE_FILE):
         self.db = db
         self.api_base = "https://api.urbandictionary.com/v0"
+        # Keep-alive session; throttled and failed requests are retried
+        # with backoff before fetch_definition gives up
         self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=MAX_CONCURRENT_REQUESTS,
+            max_retries=Retry(total=MAX_RETRIES, backoff_factor=RETRY_BACKOFF,
+                              status_forcelist=RETRY_STATUSES)
+        ))
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        self.cache = ResponseCache(cache_file)
+        self._last_request = 0.0  # monotonic time of the last sequential request
+        self._inflight = {}  # lowercased word -> future of a concurrent fetch
+        self.failed_words = set()  # words whose fetch failed with nothing cached
+        self._word_ids = {}  # word -> id (None if absent), preloaded by load_word_ids
         self.ud_source_id = None
+        self._tag_ids = {}  # tag_name -> id, loaded by setup_source
 
     def setup_source(self):
         """Create Urban Dictionary as a data source"""
@@ -36,32 +195,123 @@ class UrbanDictionaryIntegrator:
             self.ud_source_id = cursor.lastrowid
             self.db.commit()
 
+        cursor = self.db.execute("SELECT tag_name, id FROM tags")
+        self._tag_ids = {row[0]: row[1] for row in cursor.fetchall()}
+
+        # Resume checkpoint: words already integrated, and when
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS ud_integrated (
+                word TEXT PRIMARY KEY,
+                run_date TEXT
+            )
+        """)
+        self.db.commit()
+
         print(f"Urban Dictionary source ID: {self.ud_source_id}")
 
     def fetch_definition(self, word: str):
         """Fetch Urban Dictionary definition for a word"""
+        entries = self.cache.get(word)
+        if entries is not None:
+            return entries
+
         try:
+            # Rate limiting - be nice to the API
+            wait = self._last_request + REQUEST_INTERVAL - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request = time.monotonic()
+
             url = f"{self.api_base}/define"
             params = {'term': word}
 
-            response = self.session.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
 
-            data = response.json()
-            return data.get('list', [])
+            entries = response.json().get('list', [])
+            self.cache.put(word, entries)
+            return entries
 
         except Exception as e:
-            print(f"Error fetching '{word}': {e}")
-            return []
+            return self.fetch_failed(word, e)
+
+    async def fetch_definition_async(self, session, word: str, limiter: RateLimiter):
+        """
+        Fetch Urban Dictionary definition for a word on an aiohttp session.
+
+        Concurrent calls for the same word share a single request.
+        """
+        key = word.lower()
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await pending
+
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            entries = await self._request_definition(session, word, limiter)
+            future.set_result(entries)
+            return entries
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _request_definition(self, session, word: str, limiter: RateLimiter):
+        """Cache lookup and rate-limited, retried API request behind fetch_definition_async"""
+        entries = self.cache.get(word)
+        if entries is not None:
+            return entries
+
+        try:
+            url = f"{self.api_base}/define"
+            for attempt in range(MAX_RETRIES + 1):
+                await limiter.wait()
+
+                async with session.get(url, params={'term': word}) as response:
+                    if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                        response.raise_for_status()
+                        data = await response.json()
+                        break
+
+                    delay = retry_delay(attempt, response.headers.get('Retry-After'))
+
+                # Throttling holds back every fetcher; a server error only this one
+                if response.status == 429:
+                    limiter.pause(delay)
+                else:
+                    await asyncio.sleep(delay)
+
+            entries = data.get('list', [])
+            self.cache.put(word, entries)
+            return entries
+
+        except Exception as e:
+            return self.fetch_failed(word, e)
+
+    def fetch_failed(self, word: str, error: Exception):
+        """
+        Fall back to the last cached response, even if expired, when a fetch fails.
+
+        Words with nothing cached are added to failed_words.
+        """
+        entries = self.cache.get(word, allow_stale=True)
+        if entries is not None:
+            print(f"[STALE] Using cached definitions for '{word}' after error: {error}")
+            return entries
+
+        print(f"Error fetching '{word}': {error}")
+        self.failed_words.add(word)
+        return []
 
     def clean_definition(self, text: str) -> str:
         """Clean Urban Dictionary definition text"""
         # Remove [brackets] used for internal links
-        import re
-        text = re.sub(r'\[([^\]]+)\]', r'\1', text)
+        if '[' in text:
+            text = LINK_RE.sub(r'\1', text)
 
-        # Remove excessive newlines
-        text = re.sub(r'\n+', ' ', text)
+        # Collapse each run of newlines to one space
+        text = ' '.join(filter(None, text.split('\n')))
 
         # Trim whitespace
         text = text.strip()
@@ -95,48 +345,80 @@ class UrbanDictionaryIntegrator:
         """Determine what tags to apply to UD entry"""
         definition = entry.get('definition', '').lower()
         example = entry.get('example', '').lower()
-        word = entry.get('word', '').lower()
+
+        # Markers may appear in either field, but never span the two
+        haystack = definition + '\n' + example
 
         tags = ['slang']  # All UD is slang
 
         # Internet/meme slang indicators
-        internet_markers = ['internet', 'meme', 'viral', 'online', 'twitter',
-                           'tiktok', 'instagram', 'reddit', 'social media']
-        if any(marker in definition or marker in example for marker in internet_markers):
+        if INTERNET_MARKERS_RE.search(haystack):
             tags.append('internet')
 
         # Gen Z / modern slang
-        gen_z_markers = ['gen z', 'zoomer', 'tiktok', 'no cap', 'fr fr']
-        if any(marker in definition or marker in example for marker in gen_z_markers):
+        if GEN_Z_MARKERS_RE.search(haystack):
             tags.append('modern')
 
         # AAVE
-        aave_markers = ['aave', 'black', 'african american', 'hood']
-        if any(marker in definition for marker in aave_markers):
+        if AAVE_MARKERS_RE.search(definition):
             tags.append('AAVE')
 
         # Vulgar content
-        if entry.get('thumbs_up', 0) > 100 and any(word in definition for word in ['sex', 'fuck', 'shit']):
+        if entry.get('thumbs_up', 0) > 100 and VULGAR_MARKERS_RE.search(definition):
             tags.append('vulgar')
 
         return tags
 
-    def integrate_word(self, word: str):
-        """Fetch UD definitions for a word and integrate into database"""
-        # Check if word exists in our database
+    def get_tag_id(self, tag_name: str) -> int:
+        """Get a tag's id, creating it as a slang tag if needed"""
+        tag_id = self._tag_ids.get(tag_name)
+        if tag_id is None:
+            tag_id = self._tag_ids[tag_name] = self.db.insert_tag(tag_name, 'slang')
+        return tag_id
+
+    def load_word_ids(self, words: list):
+        """Look up the ids of many English words in one query for get_word_id"""
+        placeholders = ','.join('?' * len(words))
+        cursor = self.db.execute(f"""
+            SELECT word, id FROM words
+            WHERE language_code = 'en' AND word IN ({placeholders})
+        """, words)
+
+        # Words not in the database are remembered as None
+        self._word_ids.update(dict.fromkeys(words))
+        self._word_ids.update(cursor.fetchall())
+
+    def get_word_id(self, word: str):
+        """Look up the id of an English word, or None if it is not in the database"""
+        if word in self._word_ids:
+            return self._word_ids[word]
+
         cursor = self.db.execute("""
             SELECT id FROM words WHERE word = ? AND language_code = 'en'
         """, (word,))
 
         word_row = cursor.fetchone()
-        if not word_row:
-            return None  # Word not in our database
+        return word_row[0] if word_row else None
 
-        word_id = word_row[0]
+    def integrate_word(self, word: str):
+        """Fetch UD definitions for a word and integrate into database"""
+        # Check if word exists in our database
+        word_id = self.get_word_id(word)
+        if word_id is None:
+            return None  # Word not in our database
 
         # Fetch from Urban Dictionary
         entries = self.fetch_definition(word)
 
+        return self.store_entries(word, word_id, entries)
+
+    def store_entries(self, word: str, word_id: int, entries: list):
+        """
+        Add the best valid UD entries for a word as new slang senses.
+
+        Words with valid entries are recorded in ud_integrated, even if
+        every definition was already present.
+        """
         if not entries:
             return None
 
@@ -150,22 +432,28 @@ class UrbanDictionaryIntegrator:
         valid_entries.sort(key=lambda x: x.get('thumbs_up', 0), reverse=True)
         valid_entries = valid_entries[:3]  # Top 3 definitions
 
-        added_senses = 0
-
-        for entry in valid_entries:
-            # Clean definition
-            definition = self.clean_definition(entry.get('definition', ''))
-            example = self.clean_definition(entry.get('example', ''))
-
-            # Check if this definition already exists
-            cursor = self.db.execute("""
-                SELECT id FROM senses
-                WHERE word_id = ? AND definition = ?
-                LIMIT 1
-            """, (word_id, definition))
-
-            if cursor.fetchone():
+        # Clean definitions and examples
+        cleaned = [(self.clean_definition(entry.get('definition', '')),
+                    self.clean_definition(entry.get('example', '')),
+                    entry) for entry in valid_entries]
+
+        # Check which definitions already exist, all in one query
+        definitions = [definition for definition, _, _ in cleaned]
+        placeholders = ','.join('?' * len(definitions))
+        cursor = self.db.execute(f"""
+            SELECT definition FROM senses
+            WHERE word_id = ? AND definition IN ({placeholders})
+        """, (word_id, *definitions))
+        existing = {row[0] for row in cursor.fetchall()}
+
+        example_rows = []
+        tag_rows = []
+        source_rows = []
+
+        for definition, example, entry in cleaned:
+            if definition in existing:
                 continue  # Already exists
+            existing.add(definition)
 
             # Add as new sense
             sense_id = self.db.insert_sense(
@@ -175,36 +463,37 @@ class UrbanDictionaryIntegrator:
                 sense_index=999  # Put UD senses at end
             )
 
-            # Add example
+            # Queue example, tags and source link
             if example:
-                self.db.insert_example(sense_id, example, 'Urban Dictionary')
+                example_rows.append((sense_id, example, 'Urban Dictionary'))
 
-            # Add tags
-            tags = self.categorize_slang(entry)
-            for tag_name in tags:
-                # Get or create tag
-                cursor = self.db.execute("SELECT id FROM tags WHERE tag_name = ?", (tag_name,))
-                row = cursor.fetchone()
+            for tag_name in self.categorize_slang(entry):
+                tag_rows.append((sense_id, self.get_tag_id(tag_name)))
 
-                if row:
-                    tag_id = row[0]
-                else:
-                    tag_id = self.db.insert_tag(tag_name, 'slang')
+            source_rows.append((sense_id, self.ud_source_id))
 
-                self.db.link_sense_tag(sense_id, tag_id)
-
-            # Link to source
-            self.db.execute("""
+        if source_rows:
+            self.db.insert_examples(example_rows)
+            self.db.link_sense_tags(tag_rows)
+            self.db.executemany("""
                 INSERT OR IGNORE INTO sense_sources (sense_id, source_id)
                 VALUES (?, ?)
-            """, (sense_id, self.ud_source_id))
+            """, source_rows)
 
-            added_senses += 1
+        self.db.execute("""
+            INSERT OR REPLACE INTO ud_integrated (word, run_date)
+            VALUES (?, date('now'))
+        """, (word,))
+        self.db.commit()
 
-        if added_senses > 0:
-            self.db.commit()
+        return len(source_rows)
 
-        return added_senses
+    def recently_integrated(self) -> set:
+        """Words integrated within the last RESUME_DAYS days"""
+        cursor = self.db.execute("""
+            SELECT word FROM ud_integrated WHERE run_date > date('now', ?)
+        """, (f'-{RESUME_DAYS} days',))
+        return {row[0] for row in cursor.fetchall()}
 
     def integrate_existing_words(self, limit: int = 100, focus_words: list = None):
         """
@@ -220,42 +509,53 @@ class UrbanDictionaryIntegrator:
 
         self.setup_source()
 
-        # Get words to process
+        # Get words to process, leaving out recently integrated ones
+        done = self.recently_integrated()
         if focus_words:
-            words = focus_words[:limit]
+            words = [word for word in focus_words if word not in done][:limit]
         else:
-            # Get words that likely have slang meanings
-            # Prioritize shorter, common words
-            cursor = self.db.execute("""
-                SELECT DISTINCT w.word
-                FROM words w
-                WHERE LENGTH(w.word) BETWEEN 3 AND 10
-                AND w.language_code = 'en'
-                ORDER BY RANDOM()
-                LIMIT ?
-            """, (limit,))
-            words = [row[0] for row in cursor.fetchall()]
+            words = [word for word in self.sample_words(limit) if word not in done]
+
+        if done:
+            print(f"Skipping words integrated in the last {RESUME_DAYS} days ({len(done)} on record)")
+
+        # Resolve every word's id up front instead of one query per word
+        if words:
+            self.load_word_ids(words)
 
         print(f"Processing {len(words)} words from Urban Dictionary...")
-        print("(This will take a few minutes due to API rate limiting)\n")
+        print("(This may take a while due to API rate limiting)\n")
 
         total_added = 0
         successful_words = []
 
-        for i, word in enumerate(words, 1):
-            print(f"[{i}/{len(words)}] Fetching '{word}'...", end=' ')
+        if HAS_AIOHTTP:
+            def record(i, word, added):
+                nonlocal total_added
+                if added:
+                    total_added += added
+                    successful_words.append(word)
+                    print(f"[{i}/{len(words)}] '{word}': [OK] Added {added} definitions")
+                elif word in self.failed_words:
+                    print(f"[{i}/{len(words)}] '{word}': [ERROR] Fetch failed")
+                else:
+                    print(f"[{i}/{len(words)}] '{word}': [SKIP] No valid definitions")
 
-            added = self.integrate_word(word)
+            asyncio.run(self._integrate_concurrently(words, record))
+        else:
+            for i, word in enumerate(words, 1):
+                print(f"[{i}/{len(words)}] Fetching '{word}'...", end=' ')
 
-            if added:
-                total_added += added
-                successful_words.append(word)
-                print(f"[OK] Added {added} definitions")
-            else:
-                print("[SKIP] No valid definitions")
+                added = self.integrate_word(word)
 
-            # Rate limiting - be nice to the API
-            time.sleep(1)  # 1 second between requests
+                if added:
+                    total_added += added
+                    successful_words.append(word)
+                    print(f"[OK] Added {added} definitions")
+                elif word in self.failed_words:
+                    print("[ERROR] Fetch failed")
+                else:
+                    print("[SKIP] No valid definitions")
 
         print(f"\n{'='*70}")
         print(" INTEGRATION COMPLETE")
@@ -263,11 +563,86 @@ class UrbanDictionaryIntegrator:
         print(f"Words processed: {len(words)}")
         print(f"Words with UD definitions: {len(successful_words)}")
         print(f"Total UD senses added: {total_added}")
+        if self.failed_words:
+            print(f"Words that failed to fetch: {len(self.failed_words)}")
 
         if successful_words:
             print(f"\nExample words with UD definitions:")
             print(f"  {', '.join(successful_words[:10])}")
 
+    def sample_words(self, limit: int) -> list:
+        """
+        Pick up to limit random English words that likely have slang meanings.
+
+        Probes random rowids instead of sorting the whole words table by
+        RANDOM(); falls back to the sort if too few probes hit a match.
+        """
+        cursor = self.db.execute("SELECT MAX(rowid) FROM words")
+        max_rowid = cursor.fetchone()[0] or 0
+
+        # Prioritize shorter, common words
+        rowids = random.sample(range(1, max_rowid + 1),
+                               min(max_rowid, limit * SAMPLE_PROBES_PER_WORD))
+        placeholders = ','.join('?' * len(rowids))
+        cursor = self.db.execute(f"""
+            SELECT word FROM words
+            WHERE rowid IN ({placeholders})
+            AND LENGTH(word) BETWEEN 3 AND 10
+            AND language_code = 'en'
+        """, rowids)
+        words = [row[0] for row in cursor.fetchall()]
+
+        if len(words) < limit and len(rowids) < max_rowid:
+            cursor = self.db.execute("""
+                SELECT DISTINCT w.word
+                FROM words w
+                WHERE LENGTH(w.word) BETWEEN 3 AND 10
+                AND w.language_code = 'en'
+                ORDER BY RANDOM()
+                LIMIT ?
+            """, (limit,))
+            return [row[0] for row in cursor.fetchall()]
+
+        # Rows come back in rowid order; shuffle so truncating stays unbiased
+        random.shuffle(words)
+        return words[:limit]
+
+    async def _integrate_concurrently(self, words: list, record):
+        """
+        Fetch words with up to MAX_CONCURRENT_REQUESTS requests in flight.
+
+        Fetchers hand their results to a single writer through a queue, so
+        all database work stays on one task. record(i, word, added) is
+        called as each word completes.
+        """
+        limiter = RateLimiter(REQUESTS_PER_SECOND)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        results = asyncio.Queue()
+
+        async def fetch(session, word):
+            word_id = self.get_word_id(word)
+            entries = []
+            if word_id is not None:
+                async with semaphore:
+                    entries = await self.fetch_definition_async(session, word, limiter)
+            await results.put((word, word_id, entries))
+
+        async def write():
+            for i in range(1, len(words) + 1):
+                word, word_id, entries = await results.get()
+                added = self.store_entries(word, word_id, entries) if word_id is not None else None
+                record(i, word, added)
+
+        # One pooled socket per concurrent fetch, all to the same host; the
+        # API host is only resolved every DNS_CACHE_TTL seconds
+        connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_REQUESTS,
+                                         limit_per_host=MAX_CONCURRENT_REQUESTS,
+                                         ttl_dns_cache=DNS_CACHE_TTL)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={'User-Agent': USER_AGENT}) as session:
+            await asyncio.gather(write(), *(fetch(session, word) for word in words))
+
 
 def main():
     """Main integration workflow"""
@@ -298,6 +673,7 @@ def main():
             limit=limit,
             focus_words=priority_words
         )
+        db.refresh_stats_cache()
 
     print("\n[OK] Urban Dictionary integration complete!")
     print("\nTest with:")
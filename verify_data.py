@@ -4,163 +4,158 @@ Verify data quality and explore slang/informal content
 
 from database import ThesaurusDB
 
-def analyze_slang_content():
+# Tags reported by each analysis: these names, plus every tag in the
+# analysis' category where it has one
+SLANG_TAGS = ('slang', 'informal', 'colloquial', 'vulgar')
+REGION_TAGS = ('UK', 'US', 'British', 'American', 'Australian',
+               'AAVE', 'Canadian', 'Irish', 'Scottish')
+ERA_TAGS = ('obsolete', 'archaic', 'dated', 'historical')
+
+
+def get_tag_counts(db: ThesaurusDB) -> list:
+    """
+    Count senses for every tag the analyses report, in one pass.
+
+    Returns (tag_name, category, sense_count) tuples, most used first.
+    """
+    names = SLANG_TAGS + REGION_TAGS + ERA_TAGS
+    placeholders = ','.join('?' * len(names))
+    cursor = db.execute(f"""
+        SELECT t.tag_name, t.category, COUNT(DISTINCT st.sense_id) as sense_count
+        FROM tags t
+        JOIN sense_tags st ON t.id = st.tag_id
+        WHERE t.category IN ('region', 'era')
+        OR t.tag_name IN ({placeholders})
+        GROUP BY t.id
+    """, names)
+
+    # Equal counts are listed by tag name
+    return sorted(cursor.fetchall(), key=lambda row: (-row[2], row[0]))
+
+
+def analyze_slang_content(db: ThesaurusDB, tag_counts: list):
     """Analyze slang and informal language coverage"""
-    with ThesaurusDB() as db:
-        print("="*70)
-        print(" SLANG & INFORMAL CONTENT ANALYSIS")
-        print("="*70 + "\n")
-
-        # Count slang/informal entries
-        cursor = db.execute("""
-            SELECT t.tag_name, COUNT(DISTINCT st.sense_id) as sense_count
-            FROM tags t
-            JOIN sense_tags st ON t.id = st.tag_id
-            WHERE t.tag_name IN ('slang', 'informal', 'colloquial', 'vulgar')
-            GROUP BY t.tag_name
-            ORDER BY sense_count DESC
-        """)
-
-        print("Slang/Informal tags:")
-        for row in cursor.fetchall():
-            print(f"  {row[0]:<15} {row[1]:,} senses")
-
-        # Get some random slang words
-        print("\nSample slang words:")
-        cursor = db.execute("""
-            SELECT DISTINCT w.word, s.definition, s.pos
-            FROM words w
-            JOIN senses s ON w.id = s.word_id
-            JOIN sense_tags st ON s.id = st.sense_id
-            JOIN tags t ON st.tag_id = t.id
-            WHERE t.tag_name = 'slang'
-            LIMIT 20
-        """)
-
-        for row in cursor.fetchall():
-            word = row[0]
-            definition = row[1][:60] + "..." if len(row[1]) > 60 else row[1]
-            pos = row[2] or "?"
-            try:
-                print(f"  {word:<20} ({pos}) - {definition}")
-            except UnicodeEncodeError:
-                print(f"  {word:<20} ({pos}) - [unicode definition]")
-
-
-def analyze_regional_tags():
+    print("="*70)
+    print(" SLANG & INFORMAL CONTENT ANALYSIS")
+    print("="*70 + "\n")
+
+    # Count slang/informal entries
+    print("Slang/Informal tags:")
+    for tag_name, _, sense_count in tag_counts:
+        if tag_name in SLANG_TAGS:
+            print(f"  {tag_name:<15} {sense_count:,} senses")
+
+    # Get some random slang words
+    print("\nSample slang words:")
+    cursor = db.execute("""
+        SELECT DISTINCT w.word, s.definition, s.pos
+        FROM words w
+        JOIN senses s ON w.id = s.word_id
+        JOIN sense_tags st ON s.id = st.sense_id
+        JOIN tags t ON st.tag_id = t.id
+        WHERE t.tag_name = 'slang'
+        LIMIT 20
+    """)
+
+    for row in cursor.fetchall():
+        word = row[0]
+        definition = row[1][:60] + "..." if len(row[1]) > 60 else row[1]
+        pos = row[2] or "?"
+        try:
+            print(f"  {word:<20} ({pos}) - {definition}")
+        except UnicodeEncodeError:
+            print(f"  {word:<20} ({pos}) - [unicode definition]")
+
+
+def analyze_regional_tags(tag_counts: list):
     """Check regional language coverage"""
-    with ThesaurusDB() as db:
-        print("\n" + "="*70)
-        print(" REGIONAL/CULTURAL TAGS")
-        print("="*70 + "\n")
-
-        cursor = db.execute("""
-            SELECT t.tag_name, COUNT(DISTINCT st.sense_id) as sense_count
-            FROM tags t
-            JOIN sense_tags st ON t.id = st.tag_id
-            WHERE t.category = 'region'
-            OR t.tag_name IN ('UK', 'US', 'British', 'American', 'Australian',
-                              'AAVE', 'Canadian', 'Irish', 'Scottish')
-            GROUP BY t.tag_name
-            ORDER BY sense_count DESC
-            LIMIT 15
-        """)
-
-        print("Regional tags:")
-        for row in cursor.fetchall():
-            print(f"  {row[0]:<20} {row[1]:,} senses")
-
-
-def analyze_era_tags():
+    print("\n" + "="*70)
+    print(" REGIONAL/CULTURAL TAGS")
+    print("="*70 + "\n")
+
+    regional = [row for row in tag_counts if row[1] == 'region' or row[0] in REGION_TAGS]
+
+    print("Regional tags:")
+    for tag_name, _, sense_count in regional[:15]:
+        print(f"  {tag_name:<20} {sense_count:,} senses")
+
+
+def analyze_era_tags(tag_counts: list):
     """Check temporal language coverage"""
-    with ThesaurusDB() as db:
-        print("\n" + "="*70)
-        print(" ERA/TEMPORAL TAGS")
-        print("="*70 + "\n")
-
-        cursor = db.execute("""
-            SELECT t.tag_name, COUNT(DISTINCT st.sense_id) as sense_count
-            FROM tags t
-            JOIN sense_tags st ON t.id = st.tag_id
-            WHERE t.category = 'era'
-            OR t.tag_name IN ('obsolete', 'archaic', 'dated', 'historical')
-            GROUP BY t.tag_name
-            ORDER BY sense_count DESC
-        """)
-
-        print("Era tags:")
-        for row in cursor.fetchall():
-            print(f"  {row[0]:<20} {row[1]:,} senses")
-
-
-def test_lookups():
+    print("\n" + "="*70)
+    print(" ERA/TEMPORAL TAGS")
+    print("="*70 + "\n")
+
+    print("Era tags:")
+    for tag_name, category, sense_count in tag_counts:
+        if category == 'era' or tag_name in ERA_TAGS:
+            print(f"  {tag_name:<20} {sense_count:,} senses")
+
+
+def test_lookups(db: ThesaurusDB):
     """Test looking up some common words"""
-    with ThesaurusDB() as db:
-        print("\n" + "="*70)
-        print(" SAMPLE LOOKUPS")
-        print("="*70 + "\n")
-
-        test_words = ['cool', 'hit', 'mad', 'sick', 'dope', 'fire', 'wicked',
-                     'awesome', 'bad', 'tight']
-
-        for word in test_words:
-            cursor = db.execute("""
-                SELECT COUNT(*)
-                FROM words w
-                WHERE w.word = ?
-            """, (word,))
-
-            count = cursor.fetchone()[0]
-            if count > 0:
-                # Get sense count
-                cursor = db.execute("""
-                    SELECT COUNT(s.id)
-                    FROM words w
-                    JOIN senses s ON w.id = s.word_id
-                    WHERE w.word = ?
-                """, (word,))
-                sense_count = cursor.fetchone()[0]
-
-                # Check for slang tag
-                cursor = db.execute("""
-                    SELECT COUNT(DISTINCT s.id)
-                    FROM words w
-                    JOIN senses s ON w.id = s.word_id
-                    JOIN sense_tags st ON s.id = st.sense_id
-                    JOIN tags t ON st.tag_id = t.id
-                    WHERE w.word = ? AND t.tag_name = 'slang'
-                """, (word,))
-                slang_count = cursor.fetchone()[0]
-
-                slang_marker = " [HAS SLANG]" if slang_count > 0 else ""
-                print(f"  {word:<15} {sense_count} senses{slang_marker}")
-            else:
-                print(f"  {word:<15} NOT FOUND")
-
-
-def check_synonyms():
+    print("\n" + "="*70)
+    print(" SAMPLE LOOKUPS")
+    print("="*70 + "\n")
+
+    test_words = ['cool', 'hit', 'mad', 'sick', 'dope', 'fire', 'wicked',
+                 'awesome', 'bad', 'tight']
+
+    # Sense and slang-sense counts for every test word in one query;
+    # the slang tag is unique, so the join adds at most one row per sense
+    placeholders = ','.join('?' * len(test_words))
+    cursor = db.execute(f"""
+        SELECT w.word, COUNT(s.id), COUNT(st.sense_id)
+        FROM words w
+        LEFT JOIN senses s ON w.id = s.word_id
+        LEFT JOIN sense_tags st ON s.id = st.sense_id
+            AND st.tag_id IN (SELECT id FROM tags WHERE tag_name = 'slang')
+        WHERE w.word IN ({placeholders})
+        GROUP BY w.word
+    """, test_words)
+    counts = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+    for word in test_words:
+        if word in counts:
+            sense_count, slang_count = counts[word]
+            slang_marker = " [HAS SLANG]" if slang_count > 0 else ""
+            print(f"  {word:<15} {sense_count} senses{slang_marker}")
+        else:
+            print(f"  {word:<15} NOT FOUND")
+
+
+def check_synonyms(db: ThesaurusDB):
     """Check synonym data quality"""
-    with ThesaurusDB() as db:
-        print("\n" + "="*70)
-        print(" SYNONYM DATA")
-        print("="*70 + "\n")
+    print("\n" + "="*70)
+    print(" SYNONYM DATA")
+    print("="*70 + "\n")
 
-        # Note: We haven't built synonym relationships yet
-        # This will be mostly empty for now
-        cursor = db.execute("SELECT COUNT(*) FROM relationships")
-        rel_count = cursor.fetchone()[0]
+    # Note: We haven't built synonym relationships yet
+    # This will be mostly empty for now
+    cursor = db.execute("SELECT COUNT(*) FROM relationships")
+    rel_count = cursor.fetchone()[0]
 
-        print(f"Relationship records: {rel_count}")
-        print("(Note: Synonym linking not yet implemented)")
+    print(f"Relationship records: {rel_count}")
+    print("(Note: Synonym linking not yet implemented)")
 
 
 def main():
     """Run all verification checks"""
-    analyze_slang_content()
-    analyze_regional_tags()
-    analyze_era_tags()
-    test_lookups()
-    check_synonyms()
+    # One connection for all checks keeps the page cache warm between them
+    with ThesaurusDB() as db:
+        # The tag analyses rely on the tag indexes; refresh the planner
+        # statistics so it picks them
+        db.ensure_indexes()
+        db.execute("ANALYZE")
+        db.commit()
+
+        # The three tag analyses share one counting query
+        tag_counts = get_tag_counts(db)
+        analyze_slang_content(db, tag_counts)
+        analyze_regional_tags(tag_counts)
+        analyze_era_tags(tag_counts)
+        test_lookups(db)
+        check_synonyms(db)
 
     print("\n" + "="*70)
     print(" VERIFICATION COMPLETE")
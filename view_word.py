@@ -3,77 +3,146 @@ View details for a specific word from the extracted data.
 """
 
 import json
+import re
 import sys
+from pathlib import Path
+from fetch_specific_words import make_line_matcher
 
-def view_word(word_to_find, filename="target_words.jsonl"):
+# orjson parses JSONL lines ~2-3x faster; stdlib json is the fallback
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# Sidecar written next to a JSONL file: each lowercased word mapped to the
+# byte offsets of its entries' lines
+WORD_INDEX_SUFFIX = '.idx'
+
+# Headword of a line whose object starts with a plain, unescaped "word" key
+LEADING_WORD_RE = re.compile(rb'\{\s*"word"\s*:\s*"([^"\\]*)"')
+
+
+def build_word_index(filename):
+    """Scan a JSONL file once and save the offsets of each word's lines"""
+    index = {}
+    offset = 0
+
+    with open(filename, 'rb') as f:
+        for line in f:
+            # Lines usually lead with the word, so only the rest need parsing
+            match = LEADING_WORD_RE.match(line)
+            if match:
+                word = match.group(1).decode('utf-8')
+            else:
+                word = json_loads(line).get('word', '')
+
+            index.setdefault(word.lower(), []).append(offset)
+            offset += len(line)
+
+    with open(filename + WORD_INDEX_SUFFIX, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+
+    return index
+
+
+def load_word_index(filename):
+    """Load the word index for a file, or None if missing or stale"""
+    index_path = Path(filename + WORD_INDEX_SUFFIX)
+    if not index_path.exists() or index_path.stat().st_mtime < Path(filename).stat().st_mtime:
+        return None
+
+    return json_loads(index_path.read_bytes())
+
+
+def iter_candidate_lines(word_to_find, filename, index=None):
+    """Yield the raw lines of a JSONL file that may hold entries for a word"""
+    with open(filename, 'rb') as f:
+        if index is not None:
+            for offset in index.get(word_to_find.lower(), []):
+                f.seek(offset)
+                yield f.readline()
+            return
+
+        # No index: only lines mentioning the word under a "word" key get parsed
+        may_match = make_line_matcher([word_to_find])
+        for line in f:
+            if may_match(line):
+                yield line
+
+
+def view_word(word_to_find, filename="target_words.jsonl", index=None):
     """Display formatted info for a word"""
+    if index is None:
+        index = load_word_index(filename)
+
     found = False
 
-    with open(filename, 'r', encoding='utf-8') as f:
-        for line in f:
-            entry = json.loads(line)
-
-            if entry.get('word', '').lower() == word_to_find.lower():
-                found = True
-                pos = entry.get('pos', 'unknown')
-
-                print(f"\n{'='*60}")
-                print(f"{entry['word'].upper()} ({pos})")
-                print(f"{'='*60}\n")
-
-                # Senses (definitions)
-                senses = entry.get('senses', [])
-                if senses:
-                    print("DEFINITIONS:")
-                    for i, sense in enumerate(senses, 1):
-                        glosses = sense.get('glosses', [])
-                        if glosses:
-                            print(f"  {i}. {glosses[0]}")
-
-                            # Tags - THIS IS KEY!
-                            tags = sense.get('tags', [])
-                            if tags:
-                                print(f"     Tags: [{', '.join(tags)}]")
-
-                            # Examples
-                            examples = sense.get('examples', [])
-                            if examples:
-                                ex_text = examples[0].get('text', examples[0]) if isinstance(examples[0], dict) else str(examples[0])
-                                try:
-                                    print(f"     Ex: \"{ex_text}\"")
-                                except:
-                                    pass  # Skip unicode issues
-
-                # Synonyms - CRITICAL DATA
-                synonyms = entry.get('synonyms', [])
-                if synonyms:
-                    print(f"\nSYNONYMS:")
-                    for syn in synonyms[:15]:
-                        if isinstance(syn, dict):
-                            syn_word = syn.get('word', '')
-                            syn_tags = syn.get('tags', [])
-                            tag_str = f" [{', '.join(syn_tags)}]" if syn_tags else ""
-                            print(f"  - {syn_word}{tag_str}")
-                        else:
-                            print(f"  - {syn}")
-
-                # Etymology
-                etymology = entry.get('etymology_text', '')
-                if etymology:
-                    print(f"\nETYMOLOGY:")
-                    print(f"  {etymology[:200]}...")
-
-                # Forms/Derived
-                forms = entry.get('forms', [])
-                if forms:
-                    print(f"\nFORMS:")
-                    for form in forms[:5]:
-                        if isinstance(form, dict):
-                            form_word = form.get('word', '')
-                            form_tags = form.get('tags', [])
-                            print(f"  - {form_word} [{', '.join(form_tags)}]")
-
-                print()
+    # A word can have several entries, one per part of speech
+    for line in iter_candidate_lines(word_to_find, filename, index):
+        entry = json_loads(line)
+
+        if entry.get('word', '').lower() == word_to_find.lower():
+            found = True
+            pos = entry.get('pos', 'unknown')
+
+            print(f"\n{'='*60}")
+            print(f"{entry['word'].upper()} ({pos})")
+            print(f"{'='*60}\n")
+
+            # Senses (definitions)
+            senses = entry.get('senses', [])
+            if senses:
+                print("DEFINITIONS:")
+                for i, sense in enumerate(senses, 1):
+                    glosses = sense.get('glosses', [])
+                    if glosses:
+                        print(f"  {i}. {glosses[0]}")
+
+                        # Tags - THIS IS KEY!
+                        tags = sense.get('tags', [])
+                        if tags:
+                            print(f"     Tags: [{', '.join(tags)}]")
+
+                        # Examples
+                        examples = sense.get('examples', [])
+                        if examples:
+                            ex_text = examples[0].get('text', examples[0]) if isinstance(examples[0], dict) else str(examples[0])
+                            try:
+                                print(f"     Ex: \"{ex_text}\"")
+                            except:
+                                pass  # Skip unicode issues
+
+            # Synonyms - CRITICAL DATA
+            synonyms = entry.get('synonyms', [])
+            if synonyms:
+                print(f"\nSYNONYMS:")
+                for syn in synonyms[:15]:
+                    if isinstance(syn, dict):
+                        syn_word = syn.get('word', '')
+                        syn_tags = syn.get('tags', [])
+                        tag_str = f" [{', '.join(syn_tags)}]" if syn_tags else ""
+                        print(f"  - {syn_word}{tag_str}")
+                    else:
+                        print(f"  - {syn}")
+
+            # Etymology
+            etymology = entry.get('etymology_text', '')
+            if etymology:
+                print(f"\nETYMOLOGY:")
+                print(f"  {etymology[:200]}...")
+
+            # Forms/Derived
+            forms = entry.get('forms', [])
+            if forms:
+                print(f"\nFORMS:")
+                for form in forms[:5]:
+                    if isinstance(form, dict):
+                        form_word = form.get('word', '')
+                        form_tags = form.get('tags', [])
+                        print(f"  - {form_word} [{', '.join(form_tags)}]")
+
+            print()
 
     if not found:
         print(f"'{word_to_find}' not found in data file.")
@@ -82,14 +151,11 @@ def view_word(word_to_find, filename="target_words.jsonl"):
 if __name__ == "__main__":
     # Check which words we have
     print("Available words in dataset:")
-    words_found = set()
-    with open("target_words.jsonl", 'r', encoding='utf-8') as f:
-        for line in f:
-            entry = json.loads(line)
-            words_found.add(entry.get('word', '').lower())
+    index = load_word_index("target_words.jsonl") or build_word_index("target_words.jsonl")
+    words_found = set(index)
 
     print(f"  {', '.join(sorted(words_found))}\n")
 
     # View specific words
     for word in ["angry", "cool", "slang"]:
-        view_word(word)
+        view_word(word, index=index)